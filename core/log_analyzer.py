@@ -3,7 +3,7 @@ import json
 import logging
 import os
 import re
-from time import perf_counter
+from time import perf_counter, strftime
 from typing import Any, Dict, List, Optional, Tuple
 
 from .log_parser import LogParser
@@ -155,8 +155,7 @@ class LogAnalyzer:
 
     def _get_timestamp(self) -> str:
         """获取当前时间戳"""
-        from datetime import datetime
-        return datetime.now().strftime("%Y%m%d_%H%M%S")
+        return strftime("%Y%m%d_%H%M%S")
 
     def _generate_text_log(self, log_entries: List[Dict[str, Any]], prefix: str, timestamp: str) -> str:
         """生成文本日志文件"""
@@ -3,14 +3,23 @@ import json
 import logging
 import os
 import shutil
+import threading
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # 可选依赖，缺失时使用标准库 json
+    orjson = None
 
 
 class ParserConfigManager:
     def __init__(self, config_dir: str):
         self.config_dir = config_dir
         self.logger = logging.getLogger(__name__)
+        # (厂区, 系统) -> 写入版本号，供上层缓存判断是否过期
+        self._versions: Dict[Tuple[str, str], int] = {}
+        self._versions_lock = threading.Lock()
         os.makedirs(config_dir, exist_ok=True)
 
     def get_config_path(self, factory: str, system: str) -> str:
@@ -18,6 +27,16 @@ class ParserConfigManager:
         filename = f"{factory}_{system}.json"
         return os.path.join(self.config_dir, filename)
 
+    def get_version(self, factory: str, system: str) -> int:
+        """获取配置的写入版本号，每次经由本管理器写入或迁移都会递增"""
+        return self._versions.get((factory, system), 0)
+
+    def invalidate(self, factory: str, system: str) -> None:
+        """通知缓存方配置已变化（版本号加一）"""
+        key = (factory, system)
+        with self._versions_lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+
     def load_config(self, factory: str, system: str) -> Optional[Dict[str, Any]]:
         try:
             config_path = self.get_config_path(factory, system)
@@ -46,19 +65,37 @@ class ParserConfigManager:
             self.logger.error(f"加载解析配置失败: {str(e)}")
             return None
 
+    def serialize_config(self, config: Dict[str, Any]) -> bytes:
+        """将配置序列化为落盘用的 UTF-8 字节（2 空格缩进，保留中文）"""
+        if orjson is not None:
+            # YAML/字面量导入可能带非字符串键（如版本号 1:），与 json.dumps 一样转成字符串
+            return orjson.dumps(config, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        return json.dumps(config, indent=2, ensure_ascii=False).encode('utf-8')
+
     def save_config(self, factory: str, system: str, config: Dict[str, Any]) -> bool:
         """保存解析配置"""
         try:
-            config_path = self.get_config_path(factory, system)
+            payload = self.serialize_config(config)
+        except Exception as e:
+            self.logger.error(f"序列化解析配置失败: {factory}/{system}, 错误: {str(e)}")
+            return False
+        return self.save_config_bytes(factory, system, payload)
 
-            with open(config_path, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+    def save_config_bytes(self, factory: str, system: str, payload: bytes) -> bool:
+        """直接写入已序列化的配置内容"""
+        config_path = self.get_config_path(factory, system)
+        try:
+            with open(config_path, 'wb') as f:
+                f.write(payload)
 
             self.logger.info(f"成功保存解析配置: {config_path}")
             return True
         except Exception as e:
             self.logger.error(f"保存解析配置失败: {config_path}, 错误: {str(e)}")
             return False
+        finally:
+            # 写入失败时文件也可能已被截断，同样视为已变化
+            self.invalidate(factory, system)
 
     def rename_namespace(
         self,
@@ -84,6 +121,8 @@ class ParserConfigManager:
                 )
 
             shutil.move(src, dst)
+            self.invalidate(old_factory, old_system)
+            self.invalidate(new_factory, new_system)
             self.logger.info(
                 "解析配置已从 %s/%s 重命名为 %s/%s",
                 old_factory,
@@ -1,21 +1,100 @@
 """围绕解析配置构建的纯业务逻辑封装。"""
 from __future__ import annotations
 
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, TypeVar
 
 from core.parser_config_manager import ParserConfigManager
 
+try:
+    import fastjsonschema
+except ImportError:  # 可选依赖，缺失时退回手写校验
+    fastjsonschema = None
+
+
+# 与 _validate_config 的手写规则一一对应；采用 draft-04 语义，
+# 使 integer 不接受 1.0 这类浮点数，保证快速路径不会比手写校验更宽松。
+_CONFIG_SCHEMA: Dict[str, Any] = {
+    "$schema": "http://json-schema.org/draft-04/schema#",
+    "type": "object",
+    "additionalProperties": {
+        "type": "object",
+        "properties": {
+            "Versions": {
+                "type": "object",
+                "additionalProperties": {
+                    "type": "object",
+                    "properties": {
+                        "Fields": {
+                            "type": "object",
+                            "additionalProperties": {
+                                "type": "object",
+                                "properties": {
+                                    "Start": {"type": "integer", "minimum": 0},
+                                    "Length": {"type": ["integer", "null"], "minimum": -1},
+                                },
+                                "required": ["Start"],
+                            },
+                        },
+                    },
+                },
+            },
+        },
+    },
+}
+
+_VALIDATOR = fastjsonschema.compile(_CONFIG_SCHEMA) if fastjsonschema else None
+
+# 只读的共享空映射，用作缺失/空的 Versions、Fields、Escapes 的遍历兜底
+_EMPTY_DICT: Mapping[str, Any] = MappingProxyType({})
+
+_T = TypeVar("_T")
+
+# 树构建/搜索按报文类型并行：只有自由线程（无 GIL）解释器才能真正并行，
+# 普通 CPython 上保持串行。报文类型过少时线程池开销大于收益。
+_GIL_ENABLED = getattr(sys, "_is_gil_enabled", lambda: True)()
+_PARALLEL_WORKERS = 1 if _GIL_ENABLED else (os.cpu_count() or 1)
+_PARALLEL_MIN_MESSAGE_TYPES = 256
+
+
+@lru_cache(maxsize=4096)
+def _split_path(key: str) -> Tuple[str, ...]:
+    """拆分 "报文.Versions.版本.Fields.字段" 形式的更新路径；界面批量更新时同一路径反复出现。"""
+    return tuple(sys.intern(part) for part in key.split("."))
+
 
 class ParserConfigService:
     def __init__(self, manager: ParserConfigManager) -> None:
         self._manager = manager
+        # (厂区, 系统) -> ((管理器版本号, st_mtime_ns, st_size), 配置, 修改时间, 文件大小)。
+        # 配置目录可能是多客户端共用的 NAS 路径：每次读取 stat 一次，
+        # 本进程写入（版本号）或其他进程改动文件（修改时间/大小）都视为过期。
+        self._cache: Dict[
+            Tuple[str, str],
+            Tuple[Tuple[int, Optional[int], Optional[int]], Dict[str, Any], Optional[float], Optional[int]],
+        ] = {}
 
     # ------------------------------------------------------------------
     # 查询
     # ------------------------------------------------------------------
     def load_config(self, factory: str, system: str) -> Dict[str, Any]:
-        return self._manager.load_config(factory, system) or {}
+        """读取配置（带缓存）。返回值与缓存共享，调用方只读使用。"""
+        key = (factory, system)
+        version = self._manager.get_version(factory, system)
+        st = self._safe_stat(self._manager.get_config_path(factory, system))
+        stamp = (version, st.st_mtime_ns, st.st_size) if st else (version, None, None)
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        config = self._manager.load_config(factory, system) or {}
+        self._cache[key] = (stamp, config, st.st_mtime if st else None, st.st_size if st else None)
+        return config
 
     def build_tree(self, factory: str, system: str) -> List[Dict[str, Any]]:
         config = self.load_config(factory, system)
@@ -24,9 +103,9 @@ class ParserConfigService:
     def collect_stats(self, factory: str, system: str) -> Dict[str, Any]:
         config = self.load_config(factory, system)
         stats = self._calculate_config_stats(config)
-        config_path = self._manager.get_config_path(factory, system)
-        stats["last_modified"] = self._safe_mtime(config_path)
-        stats["file_size"] = self._safe_size(config_path)
+        _, _, mtime, size = self._cache[(factory, system)]
+        stats["last_modified"] = mtime
+        stats["file_size"] = size
         return stats
 
     def search(self, factory: str, system: str, query: str, search_type: str) -> List[Dict[str, Any]]:
@@ -38,9 +117,7 @@ class ParserConfigService:
     # ------------------------------------------------------------------
     def save(self, factory: str, system: str, config: Dict[str, Any]) -> Dict[str, Any]:
         self._validate_config(config)
-        ok = self._manager.save_config(factory, system, config)
-        if not ok:
-            raise ValueError("保存配置失败")
+        self._persist(factory, system, config)
         return config
 
     def update(self, factory: str, system: str, updates: Dict[str, Any]) -> Dict[str, Any]:
@@ -49,18 +126,14 @@ class ParserConfigService:
             raise ValueError("未找到现有配置")
         patched = self._apply_config_updates(existing, updates)
         self._validate_config(patched)
-        ok = self._manager.save_config(factory, system, patched)
-        if not ok:
-            raise ValueError("保存配置失败")
+        self._persist(factory, system, patched)
         return patched
 
     def merge(self, factory: str, system: str, incoming: Dict[str, Any]) -> Dict[str, Any]:
         existing = self._manager.load_config(factory, system) or {}
         merged = self._merge_config(existing, incoming or {})
         self._validate_config(merged)
-        ok = self._manager.save_config(factory, system, merged)
-        if not ok:
-            raise ValueError("保存配置失败")
+        self._persist(factory, system, merged)
         return merged
 
     def transfer_namespace(
@@ -82,14 +155,35 @@ class ParserConfigService:
             new_system,
         )
 
+    def _persist(self, factory: str, system: str, config: Dict[str, Any]) -> None:
+        """写盘并用刚写入的内容预热缓存，后续读取只需 stat 比对即可命中。"""
+        try:
+            payload = self._manager.serialize_config(config)
+        except Exception as exc:
+            raise ValueError("保存配置失败") from exc
+        ok = self._manager.save_config_bytes(factory, system, payload)
+        if not ok:
+            raise ValueError("保存配置失败")
+        key = (factory, system)
+        st = self._safe_stat(self._manager.get_config_path(factory, system))
+        if st is None:
+            self._cache.pop(key, None)
+            return
+        stamp = (self._manager.get_version(factory, system), st.st_mtime_ns, st.st_size)
+        # 缓存取落盘内容的解析结果：导入带来的整数键、元组等与文件一致地变为字符串键、列表
+        self._cache[key] = (stamp, json.loads(payload), st.st_mtime, st.st_size)
+
     # ------------------------------------------------------------------
     # 纯数据算法（以下方法全部是内部实现）
     # ------------------------------------------------------------------
     def _merge_config(self, existing: Dict[str, Any], incoming: Dict[str, Any]) -> Dict[str, Any]:
-        result = deepcopy(existing or {})
-        if not isinstance(incoming, dict):
-            return result
-        for msg_type, msg_cfg in (incoming or {}).items():
+        if not isinstance(incoming, dict) or not incoming:
+            return deepcopy(existing or {})
+        if not existing:
+            # 首次上传：没有可合并的内容，直接复制一份即可
+            return deepcopy(incoming)
+        result = deepcopy(existing)
+        for msg_type, msg_cfg in incoming.items():
             if msg_type not in result:
                 result[msg_type] = deepcopy(msg_cfg)
                 continue
@@ -97,13 +191,16 @@ class ParserConfigService:
             if msg_cfg.get("Description") and not tgt_msg.get("Description"):
                 tgt_msg["Description"] = msg_cfg.get("Description", "")
             tgt_versions = tgt_msg.setdefault("Versions", {})
-            src_versions = (msg_cfg.get("Versions") or {})
+            src_versions = msg_cfg.get("Versions") or _EMPTY_DICT
             for ver, ver_cfg in src_versions.items():
                 if ver not in tgt_versions:
-                    tgt_versions[ver] = {"Fields": deepcopy((ver_cfg.get("Fields") or {}))}
+                    src_fields = ver_cfg.get("Fields") or _EMPTY_DICT
+                    tgt_versions[ver] = {
+                        "Fields": {name: self._copy_field(f_cfg) for name, f_cfg in src_fields.items()}
+                    }
                     continue
                 tgt_fields = tgt_versions[ver].setdefault("Fields", {})
-                src_fields = (ver_cfg.get("Fields") or {})
+                src_fields = ver_cfg.get("Fields") or _EMPTY_DICT
                 for field, f_cfg in src_fields.items():
                     if field not in tgt_fields:
                         new_field = {
@@ -112,11 +209,11 @@ class ParserConfigService:
                         }
                         esc = f_cfg.get("Escapes")
                         if isinstance(esc, dict):
-                            new_field["Escapes"] = deepcopy(esc)
+                            new_field["Escapes"] = dict(esc)
                         tgt_fields[field] = new_field
                         continue
                     tgt_field = tgt_fields[field]
-                    src_esc = (f_cfg.get("Escapes") or {})
+                    src_esc = f_cfg.get("Escapes")
                     if isinstance(src_esc, dict) and src_esc:
                         tgt_esc = tgt_field.setdefault("Escapes", {})
                         for k, v in src_esc.items():
@@ -124,61 +221,92 @@ class ParserConfigService:
                                 tgt_esc[k] = v
         return result
 
+    @staticmethod
+    def _copy_field(field_config: Any) -> Any:
+        """复制单个字段配置：字段只有标量与一层 Escapes 字典，无需 deepcopy。"""
+        if not isinstance(field_config, dict):
+            return deepcopy(field_config)
+        copied = dict(field_config)
+        esc = copied.get("Escapes")
+        if isinstance(esc, dict):
+            copied["Escapes"] = dict(esc)
+        return copied
+
+    def _map_message_types(self, func: Callable[..., _T], config: Dict[str, Any], *args: Any) -> List[_T]:
+        """按报文类型逐个调用 func，结果保持配置中的顺序。
+
+        仅在无 GIL 的解释器上且报文类型足够多时才分发到线程池，
+        否则线程切换只会增加开销，直接串行执行。
+        """
+        items = config.items()
+        if _PARALLEL_WORKERS <= 1 or len(config) < _PARALLEL_MIN_MESSAGE_TYPES:
+            return [func(message_type, message_config, *args) for message_type, message_config in items]
+        with ThreadPoolExecutor(max_workers=_PARALLEL_WORKERS) as pool:
+            futures = [pool.submit(func, message_type, message_config, *args) for message_type, message_config in items]
+            return [future.result() for future in futures]
+
     def _build_config_tree(self, config: Dict[str, Any], factory: str, system: str) -> List[Dict[str, Any]]:
-        tree_data: List[Dict[str, Any]] = []
-        for message_type, message_config in (config or {}).items():
-            message_node = {
-                "type": "message_type",
-                "name": message_type,
-                "description": message_config.get("Description", ""),
-                "path": f"{factory}/{system}/{message_type}",
+        if not config:
+            return []
+        return self._map_message_types(self._build_message_subtree, config, factory, system)
+
+    def _build_message_subtree(
+        self,
+        message_type: str,
+        message_config: Dict[str, Any],
+        factory: str,
+        system: str,
+    ) -> Dict[str, Any]:
+        message_node = {
+            "type": "message_type",
+            "name": message_type,
+            "description": message_config.get("Description", ""),
+            "path": f"{factory}/{system}/{message_type}",
+            "children": [],
+        }
+
+        versions = message_config.get("Versions") or _EMPTY_DICT
+        for version, version_config in versions.items():
+            version_node = {
+                "type": "version",
+                "name": version,
+                "path": f"{factory}/{system}/{message_type}/{version}",
+                "parent": message_type,
                 "children": [],
             }
 
-            versions = message_config.get("Versions", {})
-            for version, version_config in versions.items():
-                version_node = {
-                    "type": "version",
-                    "name": version,
-                    "path": f"{factory}/{system}/{message_type}/{version}",
+            fields = version_config.get("Fields") or _EMPTY_DICT
+            for field, field_config in fields.items():
+                field_node = {
+                    "type": "field",
+                    "name": field,
+                    "path": f"{factory}/{system}/{message_type}/{version}/{field}",
                     "parent": message_type,
+                    "version": version,
+                    "start": field_config.get("Start", 0),
+                    "length": field_config.get("Length", -1),
+                    "order": field_config.get("Order"),
+                    "has_escapes": bool(field_config.get("Escapes")),
                     "children": [],
                 }
 
-                fields = version_config.get("Fields", {})
-                for field, field_config in fields.items():
-                    field_node = {
-                        "type": "field",
-                        "name": field,
-                        "path": f"{factory}/{system}/{message_type}/{version}/{field}",
+                escapes = field_config.get("Escapes") or _EMPTY_DICT
+                for escape_key, escape_value in escapes.items():
+                    escape_node = {
+                        "type": "escape",
+                        "name": escape_key,
+                        "value": escape_value,
+                        "path": f"{factory}/{system}/{message_type}/{version}/{field}/{escape_key}",
                         "parent": message_type,
                         "version": version,
-                        "start": field_config.get("Start", 0),
-                        "length": field_config.get("Length", -1),
-                        "order": field_config.get("Order"),
-                        "has_escapes": bool(field_config.get("Escapes")),
-                        "children": [],
+                        "field": field,
                     }
+                    field_node["children"].append(escape_node)
 
-                    escapes = field_config.get("Escapes", {})
-                    for escape_key, escape_value in escapes.items():
-                        escape_node = {
-                            "type": "escape",
-                            "name": escape_key,
-                            "value": escape_value,
-                            "path": f"{factory}/{system}/{message_type}/{version}/{field}/{escape_key}",
-                            "parent": message_type,
-                            "version": version,
-                            "field": field,
-                        }
-                        field_node["children"].append(escape_node)
-
-                    version_node["children"].append(field_node)
-
-                message_node["children"].append(version_node)
+                version_node["children"].append(field_node)
 
-            tree_data.append(message_node)
-        return tree_data
+            message_node["children"].append(version_node)
+        return message_node
 
     def _calculate_config_stats(self, config: Dict[str, Any]) -> Dict[str, int]:
         stats = {
@@ -192,13 +320,13 @@ class ParserConfigService:
 
         stats["message_types"] = len(config)
         for message_config in config.values():
-            versions = message_config.get("Versions", {})
+            versions = message_config.get("Versions") or _EMPTY_DICT
             stats["versions"] += len(versions)
             for version_config in versions.values():
-                fields = version_config.get("Fields", {})
+                fields = version_config.get("Fields") or _EMPTY_DICT
                 stats["fields"] += len(fields)
                 for field_config in fields.values():
-                    escapes = field_config.get("Escapes", {})
+                    escapes = field_config.get("Escapes") or _EMPTY_DICT
                     stats["escapes"] += len(escapes)
         return stats
 
@@ -211,79 +339,103 @@ class ParserConfigService:
         system: str,
     ) -> List[Dict[str, Any]]:
         results: List[Dict[str, Any]] = []
-        if not query:
+        if not query or not config:
             return results
         query_lower = query.lower()
 
-        for message_type, message_config in config.items():
-            if search_type in ("all", "message_type"):
-                description = message_config.get("Description", "")
-                if (
-                    query_lower in message_type.lower()
-                    or (description and query_lower in description.lower())
-                ):
-                    results.append(
-                        {
-                            "type": "message_type",
-                            "name": message_type,
-                            "description": description,
-                            "path": f"{factory}/{system}/{message_type}",
-                            "match_type": "name"
-                            if query_lower in message_type.lower()
-                            else "description",
-                        }
-                    )
+        def search_one(message_type: str, message_config: Dict[str, Any]) -> List[Dict[str, Any]]:
+            return self._search_message(message_type, message_config, query_lower, search_type, factory, system)
 
-            versions = message_config.get("Versions", {})
-            for version, version_config in versions.items():
-                if search_type in ("all", "version") and query_lower in version.lower():
+        for partial in self._map_message_types(search_one, config):
+            results.extend(partial)
+        return results
+
+    def _search_message(
+        self,
+        message_type: str,
+        message_config: Dict[str, Any],
+        query_lower: str,
+        search_type: str,
+        factory: str,
+        system: str,
+    ) -> List[Dict[str, Any]]:
+        results: List[Dict[str, Any]] = []
+        if search_type in ("all", "message_type"):
+            description = message_config.get("Description", "")
+            if (
+                query_lower in message_type.lower()
+                or (description and query_lower in description.lower())
+            ):
+                results.append(
+                    {
+                        "type": "message_type",
+                        "name": message_type,
+                        "description": description,
+                        "path": f"{factory}/{system}/{message_type}",
+                        "match_type": "name"
+                        if query_lower in message_type.lower()
+                        else "description",
+                    }
+                )
+
+        versions = message_config.get("Versions") or _EMPTY_DICT
+        for version, version_config in versions.items():
+            if search_type in ("all", "version") and query_lower in version.lower():
+                results.append(
+                    {
+                        "type": "version",
+                        "name": version,
+                        "path": f"{factory}/{system}/{message_type}/{version}",
+                        "parent": message_type,
+                        "match_type": "name",
+                    }
+                )
+
+            fields = version_config.get("Fields") or _EMPTY_DICT
+            for field, field_config in fields.items():
+                if search_type in ("all", "field") and query_lower in field.lower():
                     results.append(
                         {
-                            "type": "version",
-                            "name": version,
-                            "path": f"{factory}/{system}/{message_type}/{version}",
+                            "type": "field",
+                            "name": field,
+                            "path": f"{factory}/{system}/{message_type}/{version}/{field}",
                             "parent": message_type,
+                            "version": version,
+                            "start": field_config.get("Start", 0),
+                            "length": field_config.get("Length", -1),
                             "match_type": "name",
                         }
                     )
 
-                fields = version_config.get("Fields", {})
-                for field, field_config in fields.items():
-                    if search_type in ("all", "field") and query_lower in field.lower():
+                escapes = field_config.get("Escapes") or _EMPTY_DICT
+                for escape_key, escape_value in escapes.items():
+                    if search_type in ("all", "escape") and (
+                        query_lower in escape_key.lower()
+                        or query_lower in str(escape_value).lower()
+                    ):
                         results.append(
                             {
-                                "type": "field",
-                                "name": field,
-                                "path": f"{factory}/{system}/{message_type}/{version}/{field}",
+                                "type": "escape",
+                                "name": escape_key,
+                                "value": escape_value,
+                                "path": f"{factory}/{system}/{message_type}/{version}/{field}/{escape_key}",
                                 "parent": message_type,
                                 "version": version,
-                                "start": field_config.get("Start", 0),
-                                "length": field_config.get("Length", -1),
-                                "match_type": "name",
+                                "field": field,
+                                "match_type": "escape",
                             }
                         )
-
-                    escapes = field_config.get("Escapes", {})
-                    for escape_key, escape_value in escapes.items():
-                        if search_type in ("all", "escape") and (
-                            query_lower in escape_key.lower()
-                            or query_lower in str(escape_value).lower()
-                        ):
-                            results.append(
-                                {
-                                    "type": "escape",
-                                    "name": escape_key,
-                                    "value": escape_value,
-                                    "path": f"{factory}/{system}/{message_type}/{version}/{field}/{escape_key}",
-                                    "parent": message_type,
-                                    "version": version,
-                                    "field": field,
-                                    "match_type": "escape",
-                                }
-                            )
         return results
 
     def _validate_config(self, config: Dict[str, Any]) -> None:
+        if _VALIDATOR is not None:
+            try:
+                _VALIDATOR(config)
+                return
+            except fastjsonschema.JsonSchemaException:
+                # 校验失败时走下面的手写逻辑，以便给出定位到具体字段的中文提示
+                pass
+
         if not isinstance(config, dict):
             raise ValueError("配置必须是字典类型")
 
@@ -322,29 +474,15 @@ class ParserConfigService:
     def _apply_config_updates(self, existing_config: Dict[str, Any], updates: Dict[str, Any]) -> Dict[str, Any]:
         updated_config = deepcopy(existing_config)
         for key, value in updates.items():
-            keys = key.split(".")
+            *parents, leaf = _split_path(key)
             current: Dict[str, Any] = updated_config
-            for part in keys[:-1]:
+            for part in parents:
                 current = current.setdefault(part, {})
-            current[keys[-1]] = value
+            current[leaf] = value
         return updated_config
 
-    def _safe_mtime(self, path: str) -> Optional[float]:
+    def _safe_stat(self, path: str) -> Optional[os.stat_result]:
         try:
-            import os
-
-            if os.path.exists(path):
-                return os.path.getmtime(path)
-            return None
-        except OSError:
-            return None
-
-    def _safe_size(self, path: str) -> Optional[int]:
-        try:
-            import os
-
-            if os.path.exists(path):
-                return os.path.getsize(path)
-            return None
+            return os.stat(path)
         except OSError:
             return None
@@ -1,85 +1,97 @@
 # core/report_generator.py
+import gzip
+import hashlib
 import html
 import json
 import logging
 import os
+import re
+import shutil
+import threading
 from datetime import datetime
+from functools import lru_cache
+from time import strftime
 from typing import List, Dict, Any
 
-class ReportGenerator:
-    def __init__(self, output_dir: str):
-        self.output_dir = output_dir
-        self.logger = logging.getLogger(__name__)
-        os.makedirs(output_dir, exist_ok=True)
+try:
+    import orjson
+except ImportError:  # 可选依赖，缺失时使用标准库 json
+    orjson = None
 
-    def _get_timestamp(self) -> str:
-        """获取当前时间戳"""
-        return datetime.now().strftime("%Y%m%d_%H%M%S")
 
-    def _get_attr(self, obj: Any, key: str, default: Any = None) -> Any:
-        if obj is None:
-            return default
-        if isinstance(obj, dict):
-            return obj.get(key, default)
-        return getattr(obj, key, default)
+# 行渲染中调用频繁，绑定为模块级名称省去每次的属性查找
+_escape = html.escape
+_HAS_HTML_SPECIAL = re.compile(r'[<>&"\']').search
 
-    def _safe_json(self, data: Any) -> str:
-        return json.dumps(data, ensure_ascii=False).replace('</', '<\\/').replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
 
-    def generate_html_logs(self, log_entries: List[Any], output_path: str, raw_log_entries: List[Dict[str, Any]] = None) -> str:
-        """生成HTML格式的日志报告"""
+def _fast_escape(text: str) -> str:
+    """无需转义的文本（常见情况）原样返回，省去 html.escape 的多次 replace 扫描。"""
+    return _escape(text) if _HAS_HTML_SPECIAL(text) else text
+
+
+def _dumps(data: Any) -> str:
+    """序列化为紧凑 JSON 文本（保留中文）；优先使用 orjson。"""
+    if orjson is not None:
         try:
-            output_dir = os.path.dirname(output_path)
-            os.makedirs(output_dir, exist_ok=True)
-            
-            filename = os.path.basename(output_path)
-            name_without_ext = os.path.splitext(filename)[0]
-            raw_filename = f"{name_without_ext}_raw.html"
-            raw_output_path = os.path.join(output_dir, raw_filename)
+            return orjson.dumps(data).decode('utf-8')
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
 
-            if raw_log_entries is None:
-                raw_log_entries = log_entries
 
-            self.logger.info(f"生成HTML报告，主文件: {output_path}")
+def _fmt_ts(dt: datetime) -> str:
+    """格式化为毫秒精度时间文本（% 格式化比 strftime 加切片快）。"""
+    return '%04d-%02d-%02d %02d:%02d:%02d.%03d' % (
+        dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second, dt.microsecond // 1000)
 
-            # 数据收集逻辑保持不变
-            all_msg_types = set()
-            for entry in raw_log_entries:
-                segments = self._get_attr(entry, 'segments', [])
-                for seg in segments:
-                    if self._get_attr(seg, 'kind') == 'msg_type':
-                        mt = str(self._get_attr(seg, 'text', '')).strip()
-                        if mt:
-                            all_msg_types.add(mt)
-            sorted_msg_types = sorted(list(all_msg_types))
-            abnormal_items = self._collect_abnormal_items(log_entries)
 
-            js_msg_types = self._safe_json(sorted_msg_types)
-            js_abnormal_items = self._safe_json(abnormal_items)
+# CSS 压缩：引号内的字符串原样保留，其余去注释、合并空白并去掉标点两侧的空白
+_CSS_COMMENT = re.compile(r'("[^"]*"|\'[^\']*\')|/\*.*?\*/', re.S)
+_CSS_SPACE = re.compile(r'("[^"]*"|\'[^\']*\')|\s*([{};,>])\s*|(:)\s+|\s+')
 
-            entry_id_map = {id(entry): i for i, entry in enumerate(raw_log_entries)}
-            def get_raw_anchor(entry_obj):
-                if entry_obj is None: return ""
-                raw_idx = entry_id_map.get(id(entry_obj))
-                return f"log_{raw_idx}" if raw_idx is not None else ""
 
-            # =================================================================
-            # 1. 生成主分析页面 (Index Page) - 布局完全重构
-            # =================================================================
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(f"""<!DOCTYPE html>
+def _minify_css(css: str) -> str:
+    """在模块加载时压缩静态样式，减小每份报告的体积。"""
+    css = _CSS_COMMENT.sub(lambda m: m.group(1) or ' ', css)
+    css = _CSS_SPACE.sub(lambda m: m.group(1) or m.group(2) or m.group(3) or ' ', css)
+    return css.strip() + '\n'
+
+
+# 内嵌到 <script> 的 JSON 安全处理：JSON 中的 '<' 只会出现在字符串里，统一写成 \u003c
+# 即可同时防住 </script> 与 <!--；U+2028/2029 在旧版 JS 中不能出现在字符串字面量里。
+# 用一张翻译表单次扫描完成，代替多次 str.replace。
+_JS_SAFE_TABLE = str.maketrans({
+    '<': '\\u003c',
+    '\u2028': '\\u2028',
+    '\u2029': '\\u2029',
+})
+
+# 报告文件写缓冲：默认 8 KiB 对几十 MB 的报告会产生大量 write 系统调用
+_WRITE_BUFFERING = 1 << 20
+# 主页面正文每累积这么多个片段拼接写出一次
+_FLUSH_PARTS = 4096
+
+# 缺省的段/请求列表：共享空元组，避免每条日志都分配一个新的空列表
+_EMPTY = ()
+
+# 主报告页 <head> 及筛选栏等静态部分：仅消息类型列表为动态数据（异常列表由服务端直接渲染进侧边栏），
+# 在模块加载时一次性构造，避免每次生成报告都重新插值整段 CSS/JS。
+_HEAD_PREFIX = """<!DOCTYPE html>
             <html>
             <head>
                 <title>日志分析报告</title>
                 <meta charset="utf-8">
                 <script>
-                    const ALL_MESSAGE_TYPES = {js_msg_types};
-                    const ABNORMAL_ITEMS = {js_abnormal_items};
+                    const ALL_MESSAGE_TYPES = """
+_HEAD_DATA_END = """;
                 </script>
-                <style>
+"""
+
+# 报告页样式与交互脚本：纯静态内容，模块加载时构造一次，作为共享文件写到报告目录
+_REPORT_CSS = _minify_css("""
                     /* Reset & Layout Base */
-                    * {{ box-sizing: border-box; }}
-                    body {{
+                    * { box-sizing: border-box; }
+                    body {
                         margin: 0;
                         padding: 0;
                         font-family: 'Segoe UI', Roboto, Helvetica, Arial, sans-serif;
@@ -88,13 +100,13 @@ class ReportGenerator:
                         height: 100vh; /* 全屏高度 */
                         overflow: hidden; /* 禁止 Body 滚动，由内部容器接管 */
                         display: flex;
-                    }}
+                    }
 
                     /* =========================================
                        Sidebar Styles (性能优化版)
                        不再使用 fixed，改为 flex item，避免重排
                     ========================================= */
-                    #sidebar {{
+                    #sidebar {
                         width: 60px; /* 默认折叠宽度 */
                         height: 100%;
                         background: #ffffff;
@@ -105,15 +117,15 @@ class ReportGenerator:
                         z-index: 50;
                         flex-shrink: 0; /* 防止被挤压 */
                         box-shadow: 2px 0 8px rgba(0,0,0,0.05);
-                    }}
+                    }
                     
                     /* 展开状态类 */
-                    #sidebar.expanded {{
+                    #sidebar.expanded {
                         width: 320px;
-                    }}
+                    }
 
                     /* Sidebar Header (Toggle Area) */
-                    .sidebar-header {{
+                    .sidebar-header {
                         height: 60px;
                         display: flex;
                         align-items: center;
@@ -122,15 +134,15 @@ class ReportGenerator:
                         border-bottom: 1px solid #f3f4f6;
                         background: #f9fafb;
                         transition: background 0.2s;
-                    }}
-                    .sidebar-header:hover {{ background: #eff6ff; }}
-                    #sidebar.expanded .sidebar-header {{
+                    }
+                    .sidebar-header:hover { background: #eff6ff; }
+                    #sidebar.expanded .sidebar-header {
                         justify-content: flex-start;
                         padding-left: 16px;
-                    }}
+                    }
 
                     /* Sidebar Icon & Text */
-                    .icon-box {{
+                    .icon-box {
                         position: relative;
                         width: 40px;
                         height: 40px;
@@ -138,19 +150,19 @@ class ReportGenerator:
                         align-items: center;
                         justify-content: center;
                         font-size: 20px;
-                    }}
-                    .sb-title {{
+                    }
+                    .sb-title {
                         display: none;
                         font-weight: 700;
                         color: #111827;
                         margin-left: 8px;
                         white-space: nowrap;
                         overflow: hidden;
-                    }}
-                    #sidebar.expanded .sb-title {{ display: block; }}
+                    }
+                    #sidebar.expanded .sb-title { display: block; }
 
                     /* Badges */
-                    .count-badge {{
+                    .count-badge {
                         position: absolute;
                         top: 2px;
                         right: 2px;
@@ -166,11 +178,11 @@ class ReportGenerator:
                         align-items: center;
                         justify-content: center;
                         padding: 0 4px;
-                    }}
-                    .count-badge.zero {{ background: #f3f4f6; color: #9ca3af; border-color: #e5e7eb; }}
+                    }
+                    .count-badge.zero { background: #f3f4f6; color: #9ca3af; border-color: #e5e7eb; }
 
                     /* Sidebar Content (Scrollable List) */
-                    .sidebar-content {{
+                    .sidebar-content {
                         flex: 1;
                         overflow-y: auto;
                         overflow-x: hidden;
@@ -178,15 +190,15 @@ class ReportGenerator:
                         pointer-events: none;
                         transition: opacity 0.1s;
                         padding: 12px;
-                    }}
-                    #sidebar.expanded .sidebar-content {{
+                    }
+                    #sidebar.expanded .sidebar-content {
                         opacity: 1;
                         pointer-events: auto;
                         transition: opacity 0.2s 0.1s; /* 延迟显示内容 */
-                    }}
+                    }
 
                     /* Abnormal Item Card */
-                    .abnormal-item {{
+                    .abnormal-item {
                         background: #fff;
                         border: 1px solid #e5e7eb;
                         border-left: 4px solid #f43f5e; /* 红色左边框醒目 */
@@ -195,14 +207,14 @@ class ReportGenerator:
                         padding: 10px;
                         cursor: pointer;
                         transition: transform 0.1s, box-shadow 0.1s;
-                    }}
-                    .abnormal-item:hover {{
+                    }
+                    .abnormal-item:hover {
                         transform: translateY(-1px);
                         box-shadow: 0 4px 6px -1px rgba(0,0,0,0.1);
                         border-color: #fecdd3; /* hover border */
-                    }}
-                    .ab-time {{ font-size: 12px; color: #6b7280; display: block; margin-bottom: 4px; }}
-                    .ab-detail-row {{
+                    }
+                    .ab-time { font-size: 12px; color: #6b7280; display: block; margin-bottom: 4px; }
+                    .ab-detail-row {
                         font-size: 12px;
                         color: #374151;
                         font-family: 'JetBrains Mono', Consolas, monospace;
@@ -211,22 +223,22 @@ class ReportGenerator:
                         border-radius: 4px;
                         margin-top: 2px;
                         word-break: break-all;
-                    }}
-                    .ab-empty {{ text-align: center; color: #9ca3af; padding: 20px; font-size: 13px; }}
+                    }
+                    .ab-empty { text-align: center; color: #9ca3af; padding: 20px; font-size: 13px; }
 
                     /* =========================================
                        Main Content Area
                     ========================================= */
-                    #main-wrapper {{
+                    #main-wrapper {
                         flex: 1;
                         display: flex;
                         flex-direction: column;
                         min-width: 0; /* Flexbox 溢出修复 */
                         height: 100%;
-                    }}
+                    }
 
                     /* Filter Bar (Sticky inside main wrapper) */
-                    #filterBar {{
+                    #filterBar {
                         flex-shrink: 0;
                         background: #fff;
                         padding: 12px 20px;
@@ -237,20 +249,20 @@ class ReportGenerator:
                         align-items: center;
                         z-index: 10;
                         box-shadow: 0 2px 4px rgba(0,0,0,0.02);
-                    }}
+                    }
 
                     /* Log Scroll Container (Independent Scroll) */
-                    #log-container {{
+                    #log-container {
                         flex: 1;
                         overflow-y: auto; /* 只有这个区域滚动 */
                         padding: 20px;
                         scroll-behavior: smooth;
-                    }}
+                    }
 
                     /* =========================================
                        Existing Log Styles (Preserved)
                     ========================================= */
-                    .timestamp {{
+                    .timestamp {
                         display: flex;
                         align-items: center;
                         padding: 6px 10px; /*稍微紧凑一点*/
@@ -261,165 +273,183 @@ class ReportGenerator:
                         border: 1px solid transparent; /* 预留边框防抖动 */
                         flex-wrap: wrap;
                         gap: 4px 8px;
-                    }}
-                    .timestamp:hover {{ background-color: #f9fafb; border-color: #e5e7eb; }}
+                        /* 屏幕外的行跳过布局与绘制；auto 记住渲染过的真实高度，滚动条不跳动 */
+                        content-visibility: auto;
+                        contain-intrinsic-size: auto 34px;
+                    }
+                    .timestamp:hover { background-color: #f9fafb; border-color: #e5e7eb; }
+                    .timestamp.hidden-row { display: none; }
                     
                     /* Segment Styles */
-                    .seg-fixed {{ display: inline-block; box-sizing: border-box; padding: 2px 6px; margin: 0 2px; border-radius: 4px; vertical-align: middle; font-family: 'JetBrains Mono', Consolas, monospace; font-size: 12px; white-space: nowrap; }}
-                    .seg-ts {{ width: 160px; font-weight: 500; }}
-                    .seg-dir {{ width: 70px; text-align: center; font-weight: 600; }}
-                    .seg-node {{ width: 50px; text-align: center; }}
-                    .seg-msgtype {{ width: 150px; text-align: center; font-weight: 600; letter-spacing: 0.5px; }}
+                    .seg-fixed { display: inline-block; box-sizing: border-box; padding: 2px 6px; margin: 0 2px; border-radius: 4px; vertical-align: middle; font-family: 'JetBrains Mono', Consolas, monospace; font-size: 12px; white-space: nowrap; }
+                    .seg-ts { width: 160px; font-weight: 500; }
+                    .seg-dir { width: 70px; text-align: center; font-weight: 600; }
+                    .seg-node { width: 50px; text-align: center; }
+                    .seg-msgtype { width: 150px; text-align: center; font-weight: 600; letter-spacing: 0.5px; }
                     
-                    .seg-node-sm {{ width: 40px; text-align: center; }}
-                    .seg-msgtype-sm {{ width: 110px; text-align: center; }}
-                    .seg-pid {{ width: 130px; text-align: center; }}
-                    .seg-free {{ display: inline-block; padding: 2px 6px; margin: 0 2px; border-radius: 4px; font-family: 'JetBrains Mono', Consolas, monospace; font-size: 12px; white-space: nowrap; }}
+                    .seg-node-sm { width: 40px; text-align: center; }
+                    .seg-msgtype-sm { width: 110px; text-align: center; }
+                    .seg-pid { width: 130px; text-align: center; }
+                    .seg-free { display: inline-block; padding: 2px 6px; margin: 0 2px; border-radius: 4px; font-family: 'JetBrains Mono', Consolas, monospace; font-size: 12px; white-space: nowrap; }
 
                     /* 筛选组件样式 (保持一致) */
-                    .filter-group {{ display: flex; align-items: center; gap: 8px; background: #f9fafb; padding: 4px 10px; border-radius: 8px; border: 1px solid #e5e7eb; }}
-                    .filter-label {{ font-size: 11px; color: #6b7280; font-weight: 600; text-transform: uppercase; }}
-                    .crystal-input {{ border: none; background: transparent; font-size: 13px; outline: none; color: #1f2937; }}
+                    .filter-group { display: flex; align-items: center; gap: 8px; background: #f9fafb; padding: 4px 10px; border-radius: 8px; border: 1px solid #e5e7eb; }
+                    .filter-label { font-size: 11px; color: #6b7280; font-weight: 600; text-transform: uppercase; }
+                    .crystal-input { border: none; background: transparent; font-size: 13px; outline: none; color: #1f2937; }
                     
                     /* Buttons */
-                    .btn {{ padding: 6px 16px; border-radius: 6px; border: 1px solid #d1d5db; background: white; cursor: pointer; font-size: 12px; font-weight: 600; }}
-                    .btn-primary {{ background: #2563eb; color: white; border: none; }}
-                    .btn-primary:hover {{ background: #1d4ed8; }}
-                    .jump-btn {{ 
+                    .btn { padding: 6px 16px; border-radius: 6px; border: 1px solid #d1d5db; background: white; cursor: pointer; font-size: 12px; font-weight: 600; }
+                    .btn-primary { background: #2563eb; color: white; border: none; }
+                    .btn-primary:hover { background: #1d4ed8; }
+                    .jump-btn { 
                         height: 22px; padding: 0 10px; border-radius: 11px; font-size: 11px;
                         background: #eff6ff; color: #2563eb; border: 1px solid #bfdbfe;
                         margin-left: auto; text-decoration: none; display: flex; align-items: center;
-                    }}
-                    .jump-btn:hover {{ background: #2563eb; color: white; }}
+                    }
+                    .jump-btn:hover { background: #2563eb; color: white; }
 
                     /* Dropdown & Tags */
-                    .msg-type-container {{ position: relative; }}
-                    .msg-type-dropdown {{ position: absolute; top: 100%; left: 0; width: 280px; background: white; border: 1px solid #e5e7eb; box-shadow: 0 10px 15px -3px rgba(0,0,0,0.1); z-index: 100; max-height: 300px; overflow-y: auto; display: none; padding: 4px; border-radius: 8px; }}
-                    .msg-type-option {{ padding: 6px 10px; cursor: pointer; font-size: 12px; border-radius: 4px; }}
-                    .msg-type-option:hover {{ background: #eff6ff; color: #1d4ed8; }}
-                    .selected-tags {{ display: flex; flex-wrap: wrap; gap: 4px; }}
-                    .tag {{ background: #eff6ff; border: 1px solid #bfdbfe; color: #1e40af; padding: 1px 6px; border-radius: 4px; font-size: 11px; display: flex; align-items: center; gap: 4px; }}
-                    .tag-remove {{ cursor: pointer; opacity: 0.6; }}
-                    .tag-remove:hover {{ opacity: 1; }}
+                    .msg-type-container { position: relative; }
+                    .msg-type-dropdown { position: absolute; top: 100%; left: 0; width: 280px; background: white; border: 1px solid #e5e7eb; box-shadow: 0 10px 15px -3px rgba(0,0,0,0.1); z-index: 100; max-height: 300px; overflow-y: auto; display: none; padding: 4px; border-radius: 8px; }
+                    .msg-type-option { padding: 6px 10px; cursor: pointer; font-size: 12px; border-radius: 4px; }
+                    .msg-type-option:hover { background: #eff6ff; color: #1d4ed8; }
+                    .selected-tags { display: flex; flex-wrap: wrap; gap: 4px; }
+                    .tag { background: #eff6ff; border: 1px solid #bfdbfe; color: #1e40af; padding: 1px 6px; border-radius: 4px; font-size: 11px; display: flex; align-items: center; gap: 4px; }
+                    .tag-remove { cursor: pointer; opacity: 0.6; }
+                    .tag-remove:hover { opacity: 1; }
 
                     /* Highlighting */
-                    .flash-highlight {{ animation: flash-bg 2s ease-out forwards; border: 1px solid #ef4444 !important; }}
-                    @keyframes flash-bg {{ 0% {{ background: #fee2e2; }} 100% {{ background: #fff; }} }}
-                    .trans-highlight {{ background-color: #f0f9ff !important; border-left: 3px solid #3b82f6 !important; }}
+                    .flash-highlight { animation: flash-bg 2s ease-out forwards; border: 1px solid #ef4444 !important; }
+                    @keyframes flash-bg { 0% { background: #fee2e2; } 100% { background: #fff; } }
+                    .trans-highlight { background-color: #f0f9ff !important; border-left: 3px solid #3b82f6 !important; }
 
                     /* Tree Structure */
-                    .badge-req {{ padding: 1px 4px; background: #dbeafe; color: #1e40af; border-radius: 3px; font-size: 10px; font-weight: bold; margin-right: 6px; border: 1px solid #bfdbfe; }}
-                    .badge-resp {{ padding: 1px 4px; background: #dcfce7; color: #166534; border-radius: 3px; font-size: 10px; font-weight: bold; margin-right: 6px; border: 1px solid #bbf7d0; }}
-                    .tree-connector {{ width: 20px; text-align: right; color: #9ca3af; margin-right: 4px; font-family: monospace; font-weight: bold; }}
-                    .resp-container {{ display: flex; align-items: center; }}
-                    .tag-abnormal {{ background: #fef2f2; border: 1px solid #fecdd3; color: #b91c1c; font-size: 11px; padding: 0 4px; border-radius: 3px; margin-left: 4px; }}
-
-                </style>
-                <script>
+                    .badge-req { padding: 1px 4px; background: #dbeafe; color: #1e40af; border-radius: 3px; font-size: 10px; font-weight: bold; margin-right: 6px; border: 1px solid #bfdbfe; }
+                    .badge-resp { padding: 1px 4px; background: #dcfce7; color: #166534; border-radius: 3px; font-size: 10px; font-weight: bold; margin-right: 6px; border: 1px solid #bbf7d0; }
+                    .tree-connector { width: 20px; text-align: right; color: #9ca3af; margin-right: 4px; font-family: monospace; font-weight: bold; }
+                    .resp-container { display: flex; align-items: center; }
+                    .tag-abnormal { background: #fef2f2; border: 1px solid #fecdd3; color: #b91c1c; font-size: 11px; padding: 0 4px; border-radius: 3px; margin-left: 4px; }
+""")
+_REPORT_JS = """
                     let selectedMsgTypes = new Set();
+                    // 报文类型的小写副本只在加载时计算一次，下拉框每次输入直接比对
+                    const ALL_MESSAGE_TYPES_LC = ALL_MESSAGE_TYPES.map(mt => mt.toLowerCase());
+                    // 筛选用的行数组：首次筛选时收集一次，并缓存每行的时间戳与报文类型
+                    let filterRows = null;
+                    let lastFilterQuery = null, lastFilterRe = null;
+                    function getFilterRows() {
+                        if(filterRows) return filterRows;
+                        filterRows = Array.from(document.querySelectorAll('.timestamp'));
+                        for(const r of filterRows) {
+                            r._ts = parseInt(r.getAttribute('data-timestamp')||0);
+                            r._mt = r.dataset.msgtype || '';
+                            r._hidden = false;
+                        }
+                        return filterRows;
+                    }
                     
                     // Sidebar Toggle Logic
-                    function toggleSidebar() {{
+                    function toggleSidebar() {
                         const sb = document.getElementById('sidebar');
                         sb.classList.toggle('expanded');
-                    }}
+                    }
 
-                    function renderAbnormalNav() {{
-                        const list = document.getElementById('sidebarContent');
-                        const badge = document.getElementById('sidebarBadge');
-                        
-                        // Set Badge
-                        const count = ABNORMAL_ITEMS.length;
-                        badge.textContent = count;
-                        if(count === 0) badge.classList.add('zero');
-                        else badge.classList.remove('zero');
-
-                        // Render List
-                        if (!list) return;
-                        list.innerHTML = '';
-                        
-                        if (count === 0) {{
-                            list.innerHTML = '<div class="ab-empty">🎉 无异常报错</div>';
-                            return;
-                        }}
-
-                        ABNORMAL_ITEMS.forEach((item) => {{
-                            const div = document.createElement('div');
-                            div.className = 'abnormal-item';
-                            
-                            // 生成详情HTML，确保显示Key=Value
-                            let detailsHtml = '';
-                            if(item.details && item.details.length > 0) {{
-                                detailsHtml = item.details.map(d => `<div class="ab-detail-row">${{d}}</div>`).join('');
-                            }} else {{
-                                detailsHtml = `<div class="ab-detail-row" style="color:#9ca3af">(无详细信息)</div>`;
-                            }}
-
-                            div.innerHTML = `
-                                <span class="ab-time">${{item.time}}</span>
-                                <div style="font-weight:600; font-size:13px; margin-bottom:4px;">${{item.msgType}}</div>
-                                ${{detailsHtml}}
-                            `;
-                            div.onclick = () => {{
-                                const target = document.getElementById(item.anchor);
-                                if (target) {{
-                                    // 查找滚动容器
-                                    const container = document.getElementById('log-container');
-                                    // 计算位置并滚动
-                                    target.scrollIntoView({{ behavior: 'smooth', block: 'center' }});
-                                    target.classList.remove('flash-highlight');
-                                    void target.offsetWidth; // trigger reflow
-                                    target.classList.add('flash-highlight');
-                                }}
-                            }};
-                            list.appendChild(div);
-                        }});
-                    }}
-
-                    function init() {{
+                    // 异常列表由服务端渲染，这里只负责点击跳转（在列表容器上统一委托）
+                    function focusAbnormalAnchor(anchor) {
+                        const target = document.getElementById(anchor);
+                        if (target) {
+                            target.scrollIntoView({ behavior: 'smooth', block: 'center' });
+                            target.classList.remove('flash-highlight');
+                            void target.offsetWidth; // trigger reflow
+                            target.classList.add('flash-highlight');
+                        }
+                    }
+
+                    function init() {
                         // Filter UI Event Bindings
                         const input = document.getElementById('msgTypeInput');
                         const dropdown = document.getElementById('msgTypeDropdown');
-                        if(input && dropdown) {{
-                            input.addEventListener('focus', () => {{ renderDropdown(input.value); dropdown.style.display = 'block'; }});
-                            input.addEventListener('input', (e) => {{ renderDropdown(e.target.value); dropdown.style.display = 'block'; }});
-                            document.addEventListener('click', (e) => {{
+                        if(input && dropdown) {
+                            input.addEventListener('focus', () => { renderDropdown(input.value); dropdown.style.display = 'block'; });
+                            input.addEventListener('input', (e) => { renderDropdown(e.target.value); dropdown.style.display = 'block'; });
+                            document.addEventListener('click', (e) => {
                                 if (!e.target.closest('.msg-type-container')) dropdown.style.display = 'none';
-                            }});
-                        }}
+                            });
+                        }
+
+                        // 搜索框输入防抖：停止输入 80ms 后在下一帧统一筛选
+                        const filterInput = document.getElementById('filterInput');
+                        if(filterInput) {
+                            let filterTimer = null;
+                            filterInput.addEventListener('input', () => {
+                                clearTimeout(filterTimer);
+                                filterTimer = setTimeout(() => requestAnimationFrame(applyFilter), 80);
+                            });
+                        }
+                        
+                        // 事务行悬停高亮：在日志容器上统一委托，不再为每行内联事件
+                        const logContainer = document.getElementById('log-container');
+                        if(logContainer) {
+                            logContainer.addEventListener('mouseover', (e) => {
+                                const row = e.target.closest('[data-trans-group]');
+                                if(row) highlightTransaction(row.dataset.transGroup);
+                            });
+                            logContainer.addEventListener('mouseout', (e) => {
+                                if(e.target.closest('[data-trans-group]')) clearHighlight();
+                            });
+                        }
                         
-                        renderAbnormalNav();
-                    }}
+                        const abnormalList = document.getElementById('sidebarContent');
+                        if(abnormalList) {
+                            abnormalList.addEventListener('click', (e) => {
+                                const item = e.target.closest('.abnormal-item');
+                                if(item) focusAbnormalAnchor(item.dataset.anchor);
+                            });
+                        }
+                    }
 
                     // --- Filtering Logic (Original) ---
-                    function renderDropdown(filterText) {{
+                    function renderDropdown(filterText) {
                         const dropdown = document.getElementById('msgTypeDropdown');
                         dropdown.innerHTML = '';
                         const lower = filterText.toLowerCase();
-                        const filtered = ALL_MESSAGE_TYPES.filter(mt => mt.toLowerCase().includes(lower) && !selectedMsgTypes.has(mt));
+                        const frag = document.createDocumentFragment();
+                        for (let i = 0; i < ALL_MESSAGE_TYPES.length; i++) {
+                            const mt = ALL_MESSAGE_TYPES[i];
+                            if (!ALL_MESSAGE_TYPES_LC[i].includes(lower) || selectedMsgTypes.has(mt)) continue;
+                            const d = document.createElement('div'); d.className='msg-type-option'; d.textContent=mt; d.onclick=()=>addMsgType(mt); frag.appendChild(d);
+                        }
                         
-                        if (filtered.length === 0) {{
+                        if (!frag.firstChild) {
                             const d = document.createElement('div'); d.className = 'msg-type-option'; d.style.color='#9ca3af'; d.textContent='无匹配项'; dropdown.appendChild(d); return;
-                        }}
-                        filtered.forEach(mt => {{
-                            const d = document.createElement('div'); d.className='msg-type-option'; d.textContent=mt; d.onclick=()=>addMsgType(mt); dropdown.appendChild(d);
-                        }});
-                    }}
-                    function addMsgType(mt) {{ selectedMsgTypes.add(mt); renderTags(); document.getElementById('msgTypeInput').value=''; document.getElementById('msgTypeDropdown').style.display='none'; applyFilter(); }}
-                    function removeMsgType(mt) {{ selectedMsgTypes.delete(mt); renderTags(); applyFilter(); }}
-                    function renderTags() {{
+                        }
+                        dropdown.appendChild(frag);
+                    }
+                    function addMsgType(mt) { selectedMsgTypes.add(mt); renderTags(); document.getElementById('msgTypeInput').value=''; document.getElementById('msgTypeDropdown').style.display='none'; applyFilter(); }
+                    function removeMsgType(mt) { selectedMsgTypes.delete(mt); renderTags(); applyFilter(); }
+                    function renderTags() {
                         const c = document.getElementById('selectedTags'); c.innerHTML='';
-                        selectedMsgTypes.forEach(mt => {{
-                            const t = document.createElement('div'); t.className='tag'; t.innerHTML=`${{mt}}<span class="tag-remove" onclick="removeMsgType('${{mt}}')">×</span>`; c.appendChild(t);
-                        }});
-                    }}
+                        selectedMsgTypes.forEach(mt => {
+                            const t = document.createElement('div'); t.className='tag'; t.innerHTML=`${mt}<span class="tag-remove" onclick="removeMsgType('${mt}')">×</span>`; c.appendChild(t);
+                        });
+                    }
                     
-                    function applyFilter() {{
+                    function applyFilter() {
                         const qRaw = document.getElementById('filterInput').value.trim();
                         let re = null;
-                        if(qRaw) {{
-                            try {{ re = new RegExp(qRaw.startsWith('/') ? qRaw.slice(1, qRaw.lastIndexOf('/')) : qRaw, 'i'); }} catch(e) {{}}
-                        }}
+                        // 不含正则元字符的查询直接做子串匹配，省去逐行正则
+                        const isLiteral = !!qRaw && !qRaw.startsWith('/') && !/[\\\\^$.*+?()[\\]{}|]/.test(qRaw);
+                        const qLower = qRaw.toLowerCase();
+                        if(qRaw && !isLiteral) {
+                            // 查询未变时复用上次编译的正则（只改时间/报文类型时常见）
+                            if(qRaw === lastFilterQuery) {
+                                re = lastFilterRe;
+                            } else {
+                                try { re = new RegExp(qRaw.startsWith('/') ? qRaw.slice(1, qRaw.lastIndexOf('/')) : qRaw, 'i'); } catch(e) {}
+                                lastFilterQuery = qRaw;
+                                lastFilterRe = re;
+                            }
+                        }
                         
                         // Time Filter Logic (Simplified for brevity, same as before)
                         const sStr = document.getElementById('startTime').value;
@@ -427,44 +457,95 @@ class ReportGenerator:
                         const sTime = sStr ? new Date(sStr).getTime() : null;
                         const eTime = eStr ? new Date(eStr).getTime() : null;
 
-                        const rows = document.querySelectorAll('.timestamp');
-                        rows.forEach(r => {{
+                        const filterMsgType = selectedMsgTypes.size > 0;
+                        const filterTime = !!(sTime || eTime);
+                        const filterText = isLiteral || !!re;
+                        const rows = getFilterRows();
+                        if(!filterMsgType && !filterTime && !filterText) {
+                            // 无任何筛选条件：只恢复被隐藏的行
+                            for(const r of rows) {
+                                if(r._hidden) { r._hidden = false; r.classList.remove('hidden-row'); }
+                            }
+                            return;
+                        }
+                        for(const r of rows) {
+                            // 由快到慢依次判断：报文类型查集合 -> 时间比较 -> 文本匹配
                             let show = true;
-                            if(re && !re.test(r.textContent)) show = false;
-                            
-                            const ts = parseInt(r.getAttribute('data-timestamp')||0);
-                            if(show && ts > 0) {{
-                                if(sTime && ts < sTime) show = false;
-                                if(eTime && ts > eTime) show = false;
-                            }}
-
-                            if(show && selectedMsgTypes.size > 0) {{
-                                const mt = r.querySelector('.seg-msgtype');
-                                if(!mt || !selectedMsgTypes.has(mt.textContent.trim())) show = false;
-                            }}
-                            r.style.display = show ? 'flex' : 'none'; // Flex display
-                        }});
-                    }}
-                    function clearFilter() {{ document.getElementById('filterInput').value=''; document.getElementById('startTime').value=''; document.getElementById('endTime').value=''; selectedMsgTypes.clear(); renderTags(); applyFilter(); }}
-                    function filterKey(e) {{ if(e.key==='Enter') applyFilter(); }}
+                            if(filterMsgType) {
+                                const mt = r._mt;
+                                if(!mt || !selectedMsgTypes.has(mt)) show = false;
+                            }
+
+                            if(show && filterTime) {
+                                const ts = r._ts;
+                                if(ts > 0 && ((sTime && ts < sTime) || (eTime && ts > eTime))) show = false;
+                            }
+
+                            if(show && filterText) {
+                                if(isLiteral) {
+                                    // 行文本不会变化，首次筛选时缓存小写副本
+                                    if(r._searchText === undefined) r._searchText = r.textContent.toLowerCase();
+                                    if(r._searchText.indexOf(qLower) === -1) show = false;
+                                } else if(!re.test(r.textContent)) show = false;
+                            }
+                            // 只在可见性变化时改动 class，减少样式重算
+                            if(r._hidden === show) {
+                                r._hidden = !show;
+                                r.classList.toggle('hidden-row', !show);
+                            }
+                        }
+                    }
+                    function clearFilter() { document.getElementById('filterInput').value=''; document.getElementById('startTime').value=''; document.getElementById('endTime').value=''; selectedMsgTypes.clear(); renderTags(); applyFilter(); }
+                    function filterKey(e) { if(e.key==='Enter') applyFilter(); }
                     
-                    function highlightTransaction(gid) {{ if(!gid)return; document.querySelectorAll(`[data-trans-group="${{gid}}"]`).forEach(el=>el.classList.add('trans-highlight')); }}
-                    function clearHighlight() {{ document.querySelectorAll('.trans-highlight').forEach(el=>el.classList.remove('trans-highlight')); }}
+                    // 事务分组索引（gid -> 行元素）在首次悬停时建立；已高亮的元素单独记录，清除时无需再查询 DOM
+                    let transGroups = null;
+                    let highlightedRows = [];
+                    function highlightTransaction(gid) {
+                        if(!gid) return;
+                        if(!transGroups) {
+                            transGroups = new Map();
+                            document.querySelectorAll('[data-trans-group]').forEach(el => {
+                                const g = el.dataset.transGroup;
+                                if(!transGroups.has(g)) transGroups.set(g, []);
+                                transGroups.get(g).push(el);
+                            });
+                        }
+                        for(const el of (transGroups.get(gid) || [])) { el.classList.add('trans-highlight'); highlightedRows.push(el); }
+                    }
+                    function clearHighlight() { highlightedRows.forEach(el=>el.classList.remove('trans-highlight')); highlightedRows = []; }
                     
                     window.addEventListener('DOMContentLoaded', init);
-                </script>
-            </head>
+"""
+
+
+def _asset_name(stem: str, ext: str, content: str) -> str:
+    """共享资源文件名带内容哈希：样式/脚本变化后换新文件，旧报告仍引用旧文件，浏览器缓存也不会串用。"""
+    return '%s.%s.%s' % (stem, hashlib.sha1(content.encode('utf-8')).hexdigest()[:10], ext)
+
+
+_REPORT_CSS_NAME = _asset_name('report', 'css', _REPORT_CSS)
+_REPORT_JS_NAME = _asset_name('report', 'js', _REPORT_JS)
+_REPORT_ASSETS = ((_REPORT_CSS_NAME, _REPORT_CSS), (_REPORT_JS_NAME, _REPORT_JS))
+# 各报告只引用共享文件，同目录下的报告共用一份、浏览器也只需解析缓存一次
+_STATIC_HEAD_ASSETS = ('                <link rel="stylesheet" href="%s">\n'
+                       '                <script src="%s"></script>\n') % (_REPORT_CSS_NAME, _REPORT_JS_NAME)
+
+# 页面主体骨架：侧边栏、筛选栏与日志容器开头；异常数徽标与异常列表在服务端直接渲染后插入两段之间
+_HEAD_BODY_PREFIX = """            </head>
             <body>
                 <div id="sidebar">
                     <div class="sidebar-header" onclick="toggleSidebar()" title="点击展开/收起">
                         <div class="icon-box">
                             ⚠️
-                            <div id="sidebarBadge" class="count-badge">0</div>
+                            """
+_HEAD_BODY_MID = """
                         </div>
                         <span class="sb-title">异常报错列表</span>
                     </div>
                     <div id="sidebarContent" class="sidebar-content">
-                        </div>
+                        """
+_HEAD_BODY_SUFFIX = """</div>
                 </div>
 
                 <div id="main-wrapper">
@@ -490,171 +571,433 @@ class ReportGenerator:
                     </div>
 
                     <div id="log-container">
-            \n""")
+            \n"""
+
+
+# 主页面行模板：使用 % 格式化，模板本身在模块加载时构造一次
+_TS_SPAN = '<span class="seg-fixed seg-ts" style="background:#e3f2fd;color:#0c4a6e;">%s</span>'
+_DIR_HEAD_SPANS = (
+    '<span class="seg-fixed seg-dir" style="background:%s;color:#1b1f23;">%s</span>'
+    '<span class="seg-fixed seg-node-sm" style="background:#f3f4f6;">%s</span>'
+    '<span style="color:#9ca3af;margin:0 2px;">:</span>'
+    '<span class="seg-fixed seg-msgtype-sm seg-msgtype" %s style="background:#fff7ed;color:#9a3412;">%s</span>'
+)
+_PID_SPAN = '<span class="seg-fixed seg-pid" style="background:#fef3c7;">%s</span>'
+_FREE_SPAN = '<span class="seg-free" style="background:#f3f4f6;">%s</span>'
+_FIELD_PALETTE = ('#e0f2fe', '#f0fdf4', '#ffedd5', '#f3e8ff', '#ecfeff')
+# 字段块按序号轮换底色：每种底色的开标签预先生成，渲染时按 idx 取模直接取用
+_FIELD_SPAN_OPEN = tuple('<span class="seg-free" style="background:%s;color:#374151;">' % c for c in _FIELD_PALETTE)
+_FIELD_PALETTE_N = len(_FIELD_PALETTE)
+_TITLE_ATTR = 'title="%s"'
+_MSGTYPE_ATTR = ' data-msgtype="%s"'
+_RETRY_BADGE = ' <span class="tag" style="background:#fee2e2;color:#991b1b;cursor:pointer;" onclick="toggleRetries(\'log_%d\')">◀ 重试 x%d</span>'
+_RETRIES_OPEN = '<div id="retries_log_%d" style="display:none; margin-left: 20px; border-left: 2px solid #e5e7eb; padding-left: 8px;">\n'
+_REQ_PREFIX = '<span class="badge-req">发送</span>'
+_NO_RESP_BADGE = ' <span class="tag" style="background:#f3f4f6;color:#6b7280;">[无回复]</span>'
+_ABNORMAL_TAG = ' <span class="tag-abnormal">异常报错</span>'
+# 方向块底色（输出红、输入绿）：常见写法直接查表，其余取值再退回小写包含判断
+_BG_INPUT = '#d1fae5'
+_BG_OUTPUT = '#fee2e2'
+_DIR_BG = {
+    'Input': _BG_INPUT, 'input': _BG_INPUT, 'INPUT': _BG_INPUT,
+    'Output': _BG_OUTPUT, 'output': _BG_OUTPUT, 'OUTPUT': _BG_OUTPUT,
+}
+
+
+@lru_cache(maxsize=4096)
+def _dir_head_spans(dir_text: str, node_text: str, desc: str, mt_html: str) -> str:
+    """方向/节点/报文类型块；组合数有限且逐行重复，整段缓存后直接复用。"""
+    bg_c = _DIR_BG.get(dir_text)
+    if bg_c is None:
+        bg_c = _BG_OUTPUT if 'output' in dir_text.lower() else _BG_INPUT  # Red/Green
+    title_attr = _TITLE_ATTR % (_fast_escape(desc),) if desc else ''
+    return _DIR_HEAD_SPANS % (bg_c, _escape(dir_text), _escape(node_text), title_attr, mt_html)
+
+
+# 行模板按 data-msgtype 属性所在位置拆为 OPEN / MID / CLOSE 三段，行内容在 MID 与 CLOSE 之间直接写入
+_TRANS_ATTR = 'data-trans-group="trans_%d"'
+_MAIN_ROW_OPEN = '        <div class="timestamp" id="ts_%d" data-timestamp="%d"'
+_MAIN_ROW_MID = """ %s>
+                            """
+_MAIN_ROW_CLOSE = """
+                            <a class="jump-btn" href="%s#%s" target="_blank">原文</a>
+                        </div>\n"""
+_RETRY_ROW_OPEN = '            <div class="timestamp"'
+_RETRY_ROW_MID = """ style="border:none; padding: 2px 0;">
+                                    <span style="color:#9ca3af; margin-right:8px; font-size:12px;">├─ 重试</span>
+                                    """
+_RETRY_ROW_CLOSE = """
+                                    <a class="jump-btn" href="%s#%s" target="_blank">原文</a>
+                                </div>\n"""
+_RESP_ROW_OPEN = '        <div class="timestamp" id="ts_%d_resp" data-timestamp="%d"'
+_RESP_ROW_MID = """ %s style="border-top:none; margin-top:-1px;">
+                            <div class="resp-container">
+                                <span class="tree-connector">└──</span>
+                                <span class="badge-resp">回复</span>
+                                """
+_RESP_ROW_CLOSE = """
+                            </div>
+                            <a class="jump-btn" href="%s#%s" target="_blank">原文</a>
+                        </div>\n"""
+
+# 侧边栏异常列表
+_ABNORMAL_BADGE = '<div id="sidebarBadge" class="count-badge%s">%d</div>'
+_ABNORMAL_EMPTY = '<div class="ab-empty">🎉 无异常报错</div>'
+_ABNORMAL_ITEM = ('<div class="abnormal-item" data-anchor="%s"><span class="ab-time">%s</span>'
+                  '<div style="font-weight:600; font-size:13px; margin-bottom:4px;">%s</div>%s</div>')
+_ABNORMAL_DETAIL = '<div class="ab-detail-row">%s</div>'
+_ABNORMAL_NO_DETAIL = '<div class="ab-detail-row" style="color:#9ca3af">(无详细信息)</div>'
+
+# 主页面结尾：收起/展开重试行的脚本
+_MAIN_FOOTER = """    </div> </div> <script>
+                    function toggleRetries(id) {
+                        var el = document.getElementById('retries_' + id);
+                        if (el) el.style.display = el.style.display === 'none' ? 'block' : 'none';
+                    }
+                </script>
+            </body>
+            </html>"""
+
+# 原文页单条日志
+_RAW_ENTRY = '<div class="log-entry" id="%s"><pre>%s\\n%s</pre></div>\n'
+
+# 原文页 <head>：标题中的文件名为唯一动态部分
+_RAW_HEAD_PREFIX = """<!DOCTYPE html>
+            <html>
+            <head>
+                <title>日志原文 - """
+_RAW_HEAD_SUFFIX = """</title>
+                <style>
+                    body { font-family: 'Segoe UI', sans-serif; margin: 20px; background: #f0f2f5; color: #374151; }
+                    .log-entry { margin: 10px 0; padding: 12px; background: white; border-radius: 6px; box-shadow: 0 2px 4px rgba(0,0,0,0.05); }
+                    pre { margin: 0; white-space: pre-wrap; font-family: 'JetBrains Mono', monospace; font-size: 13px; }
+                    .flash-highlight { animation: flash 2s ease-out forwards; border: 1px solid #dc2626; }
+                    @keyframes flash { 0% { background: #fee2e2; } 100% { background: white; } }
+                </style>
+                <script>
+                    window.onload = function() {
+                        if(location.hash) {
+                            var el = document.getElementById(location.hash.substring(1));
+                            if(el) { el.scrollIntoView({behavior:'smooth', block:'center'}); el.classList.add('flash-highlight'); }
+                        }
+                    };
+                </script>
+            </head>
+            <body>"""
+
+# 无日志条目时的占位页面
+_EMPTY_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+    <title>日志分析报告</title>
+    <meta charset="utf-8">
+</head>
+<body style="font-family: 'Segoe UI', Roboto, Helvetica, Arial, sans-serif; background: #f0f2f5; color: #6b7280; text-align: center; padding-top: 80px;">
+    没有可展示的日志条目
+</body>
+</html>"""
+
+
+class ReportGenerator:
+    # 属性固定：不建实例 __dict__
+    __slots__ = ('output_dir', 'logger', '_ensured_dirs')
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self.logger = logging.getLogger(__name__)
+        # 已确认存在的输出目录，避免每次生成报告都重复 makedirs
+        self._ensured_dirs = set()
+        self._ensure_dir(output_dir)
+
+    def _get_timestamp(self) -> str:
+        """获取当前时间戳"""
+        return strftime("%Y%m%d_%H%M%S")
+
+    def _ensure_dir(self, directory: str) -> None:
+        """创建目录；同一实例内已确认过的目录不再重复 makedirs"""
+        if directory not in self._ensured_dirs:
+            os.makedirs(directory, exist_ok=True)
+            self._ensured_dirs.add(directory)
+
+    def _get_attr(self, obj: Any, key: str, default: Any = None) -> Any:
+        if obj is None:
+            return default
+        if isinstance(obj, dict):
+            return obj.get(key, default)
+        return getattr(obj, key, default)
+
+    def _safe_json(self, data: Any) -> str:
+        return _dumps(data).translate(_JS_SAFE_TABLE)
+
+    def generate_html_logs(self, log_entries: List[Any], output_path: str, raw_log_entries: List[Dict[str, Any]] = None,
+                           compress: bool = False) -> str:
+        """生成HTML格式的日志报告；compress 为 True 时额外输出主页面与原文页的 .gz 副本"""
+        tagged_entries = _EMPTY
+        try:
+            output_dir = os.path.dirname(output_path)
+            self._ensure_dir(output_dir)
+
+            if not log_entries:
+                # 没有可展示的条目：只写一个极简页面，跳过整段 CSS/JS 与原文页
+                with open(output_path, 'w', encoding='utf-8') as f:
+                    f.write(_EMPTY_PAGE)
+                if compress:
+                    self._write_gzip_copy(output_path)
+                self.logger.info(f"无日志条目，已生成空报告: {output_path}")
+                return output_path
+
+            filename = os.path.basename(output_path)
+            if filename.endswith('.html'):
+                # 常见情况：直接替换后缀，省去 splitext/join
+                raw_filename = filename[:-5] + '_raw.html'
+                raw_output_path = output_path[:-5] + '_raw.html'
+            else:
+                name_without_ext = os.path.splitext(filename)[0]
+                raw_filename = f"{name_without_ext}_raw.html"
+                raw_output_path = os.path.join(output_dir, raw_filename)
+
+            if raw_log_entries is None:
+                raw_log_entries = log_entries
+
+            self.logger.info(f"生成HTML报告，主文件: {output_path}")
+
+            # 单次遍历原始条目：写出原文页，同时收集报文类型与原文锚点序号
+            # 锚点序号直接作为临时标记挂在条目上（生成结束后清理），
+            # 只有无法写入属性的对象才退回按 id 查表
+            all_msg_types = set()
+            add_msg_type = all_msg_types.add
+            fallback_ids = {}
+            # 原文锚点随遍历生成，主页面跳转链接与原文页 id 共用
+            anchors = []
+            add_anchor = anchors.append
+            get_attr = self._get_attr
+            tagged_entries = raw_log_entries
+            # =================================================================
+            # 1. 生成原文页面 (Raw Page)：与预处理共用一次遍历，片段分块写出
+            # =================================================================
+            with open(raw_output_path, 'w', encoding='utf-8', buffering=_WRITE_BUFFERING) as f_raw:
+                f_raw.write(_RAW_HEAD_PREFIX)
+                f_raw.write(filename)
+                f_raw.write(_RAW_HEAD_SUFFIX)
+                raw_out = []
+                raw_append = raw_out.append
+                for i, entry in enumerate(raw_log_entries):
+                    anchor = 'log_%d' % i
+                    add_anchor(anchor)
+                    # 解析条目都是 dict：直接 .get 取值，其余对象才走通用的 _get_attr
+                    if isinstance(entry, dict):
+                        entry['_raw_idx'] = i
+                        line1 = entry.get('original_line1', '')
+                        line2 = entry.get('original_line2', '')
+                        segments = entry.get('segments') or _EMPTY
+                    else:
+                        try:
+                            entry._raw_idx = i
+                        except AttributeError:
+                            fallback_ids[id(entry)] = i
+                        line1 = get_attr(entry, 'original_line1', '')
+                        line2 = get_attr(entry, 'original_line2', '')
+                        segments = get_attr(entry, 'segments') or _EMPTY
+                    raw_append(_RAW_ENTRY % (anchor, _escape(str(line1)), _escape(str(line2))))
+                    if len(raw_out) >= _FLUSH_PARTS:
+                        f_raw.write(''.join(raw_out))
+                        raw_out.clear()
+                    for seg in segments:
+                        if isinstance(seg, dict):
+                            if seg.get('kind') != 'msg_type':
+                                continue
+                            mt = seg.get('text', '')
+                        elif get_attr(seg, 'kind') == 'msg_type':
+                            mt = get_attr(seg, 'text', '')
+                        else:
+                            continue
+                        mt = str(mt).strip()
+                        if mt:
+                            add_msg_type(mt)
+                raw_append("</body></html>")
+                f_raw.write(''.join(raw_out))
+            sorted_msg_types = sorted(all_msg_types)
+            # 报文类型取值有限且在各行反复出现：按类型转义一次，渲染时查表
+            escaped_msg_types = {mt: _escape(mt) for mt in all_msg_types}
+            abnormal_items = self._collect_abnormal_items(log_entries)
+
+            js_msg_types = self._safe_json(sorted_msg_types)
+
+            def get_raw_anchor(entry_obj):
+                # 解析条目都是 dict：一次取值即可拿到序号，其余对象再走属性/id 查表
+                if isinstance(entry_obj, dict):
+                    raw_idx = entry_obj.get('_raw_idx')
+                elif entry_obj is None:
+                    return ""
+                else:
+                    raw_idx = getattr(entry_obj, '_raw_idx', None)
+                    if raw_idx is None:
+                        raw_idx = fallback_ids.get(id(entry_obj))
+                return anchors[raw_idx] if raw_idx is not None else ""
+
+            # =================================================================
+            # 2. 生成主分析页面 (Index Page) - 布局完全重构
+            # =================================================================
+            head_parts = (_HEAD_PREFIX, js_msg_types, _HEAD_DATA_END,
+                          _STATIC_HEAD_ASSETS, _HEAD_BODY_PREFIX,
+                          _ABNORMAL_BADGE % (' zero' if not abnormal_items else '', len(abnormal_items)),
+                          _HEAD_BODY_MID, self._render_abnormal_nav(abnormal_items), _HEAD_BODY_SUFFIX)
+            self._ensure_assets(output_dir)
+            with open(output_path, 'w', encoding='utf-8', buffering=_WRITE_BUFFERING) as f:
+                for part in head_parts:
+                    f.write(part)
 
                 # -------------------------------------------------------------
                 # 以下 Python 渲染循环保持逻辑一致，但结构微调
+                # 各行片段分块拼接后流式写入文件，内存占用不随报告大小增长
                 # -------------------------------------------------------------
+                # 片段先累积到列表，每满 _FLUSH_PARTS 个拼接一次写出：
+                # 既避免逐片段调用 write，又不把整份报告留在内存里
+                out = []
+                append = out.append
+
+                # 辅助：渲染一整行，各片段追加到 out；行级 data-msgtype 属性供筛选脚本直接读取
+                # 闭包只创建一次，各行复用
+                def render_line_content(entry, row_open, row_mid, row_close, prefix="", extra_badges=""):
+                    # 解析条目及其片段都是 dict：按条目判断一次类型，片段直接 .get，其余对象才走 _get_attr
+                    if isinstance(entry, dict):
+                        segs = entry.get('segments') or _EMPTY
+                        ts_val = entry.get('timestamp')
+                    else:
+                        segs = get_attr(entry, 'segments') or _EMPTY
+                        ts_val = get_attr(entry, 'timestamp')
+                    block_map = {'ts': '', 'dir': '', 'node': '', 'msg_type': '', 'ver': '', 'pid': ''}
+                    # 一遍读完：固定块取首个非空文本，字段块与自由块按原顺序分拣，kind 只取一次
+                    desc = None
+                    fields = []
+                    frees = []
+                    for s in segs:
+                        k = s.get('kind') if isinstance(s, dict) else get_attr(s, 'kind')
+                        if k == 'field':
+                            fields.append(s)
+                        elif k in block_map:
+                            if not block_map[k]: block_map[k] = get_attr(s, 'text', '')
+                            if k == 'msg_type' and desc is None: desc = get_attr(s, 'description', '')
+                        else:
+                            frees.append(s)
+
+                    # Timestamp processing
+                    ts_display = _escape(str(block_map['ts'])) if block_map['ts'] else '&nbsp;'
+                    if ts_val and isinstance(ts_val, datetime):
+                         ts_display = _fmt_ts(ts_val)
+                    elif ts_val:
+                         ts_display = _escape(str(ts_val))
+
+                    has_dir = bool(block_map['dir'])
+                    msgtype_attr = ""
+                    if has_dir:
+                        mt_text = str(block_map['msg_type'])
+                        mt_html = escaped_msg_types.get(mt_text)
+                        if mt_html is None:
+                            mt_html = _escape(mt_text)
+                        mt_key = mt_text.strip()
+                        if mt_key:
+                            mt_attr = escaped_msg_types.get(mt_key)
+                            if mt_attr is None:
+                                mt_attr = _escape(mt_key)
+                            msgtype_attr = _MSGTYPE_ATTR % (mt_attr,)
+
+                    append(row_open)
+                    append(msgtype_attr)
+                    append(row_mid)
+                    append(prefix)
+                    append(_TS_SPAN % (ts_display,))
+
+                    if has_dir:
+                        append(_dir_head_spans(str(block_map['dir']), str(block_map['node']),
+                                               str(desc) if desc else '', mt_html))
+
+                        # Field rendering
+                        for s in fields:
+                            if isinstance(s, dict):
+                                idx = s.get('idx', 0)
+                                text = s.get('text', '')
+                            else:
+                                idx = get_attr(s, 'idx', 0)
+                                text = get_attr(s, 'text', '')
+                            append(_FIELD_SPAN_OPEN[int(idx) % _FIELD_PALETTE_N])
+                            append(_escape(str(text)))
+                            append('</span>')
+                    else:
+                        # Free format fallback
+                        pid_text = block_map['pid']
+                        if pid_text: append(_PID_SPAN % (_escape(str(pid_text)),))
+                        for s in frees:
+                            text = get_attr(s, "text", "")
+                            if text: append(_FREE_SPAN % (_escape(str(text)),))
+
+                    append(extra_badges)
+                    append(row_close)
+
+                # 原文文件名在整份报告中不变：先转义并填入三种行尾模板，逐行只剩锚点一个占位
+                raw_href = _escape(raw_filename).replace('%', '%%')
+                main_close = _MAIN_ROW_CLOSE % (raw_href, '%s')
+                retry_close = _RETRY_ROW_CLOSE % (raw_href, '%s')
+                resp_close = _RESP_ROW_CLOSE % (raw_href, '%s')
+
                 for index, item in enumerate(log_entries):
                     is_transaction = hasattr(item, 'requests') and hasattr(item, 'response')
                     
                     if is_transaction:
                         main_entry = getattr(item, 'latest_request', None)
                         if not main_entry: continue
-                        retry_count = len(getattr(item, 'requests', [])) - 1
+                        retry_count = len(getattr(item, 'requests', _EMPTY)) - 1
                         has_response = getattr(item, 'response', None) is not None
                     else:
                         main_entry = item
                         retry_count = 0
                         has_response = False
 
-                    log_id = f"log_{index}"
-                    trans_group_id = f"trans_{index}" if is_transaction else ""
-                    trans_attr = f'data-trans-group="{trans_group_id}" onmouseover="highlightTransaction(\'{trans_group_id}\')" onmouseout="clearHighlight()"' if is_transaction else ""
-
-                    # 辅助：渲染单行内容
-                    def render_line_content(entry, extra_badges=""):
-                        segs = self._get_attr(entry, 'segments', [])
-                        block_map = {'ts': '', 'dir': '', 'node': '', 'msg_type': '', 'ver': '', 'pid': ''}
-                        # 简化读取
-                        for s in segs:
-                            k = self._get_attr(s, 'kind')
-                            if k in block_map and not block_map[k]: block_map[k] = self._get_attr(s, 'text', '')
-                        
-                        # Timestamp processing
-                        ts_display = block_map['ts'] or '&nbsp;'
-                        ts_val = self._get_attr(entry, 'timestamp')
-                        if ts_val and isinstance(ts_val, datetime):
-                             ts_display = ts_val.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
-                        elif ts_val:
-                             ts_display = str(ts_val)
-
-                        parts = []
-                        has_dir = bool(block_map['dir'])
-                        
-                        # Render Logic
-                        parts.append(f'<span class="seg-fixed seg-ts" style="background:#e3f2fd;color:#0c4a6e;">{ts_display}</span>')
-                        
-                        if has_dir:
-                            dlow = str(block_map['dir']).lower()
-                            bg_c = '#fee2e2' if 'output' in dlow else '#d1fae5' # Red/Green
-                            parts.append(f'<span class="seg-fixed seg-dir" style="background:{bg_c};color:#1b1f23;">{block_map["dir"]}</span>')
-                            parts.append(f'<span class="seg-fixed seg-node-sm" style="background:#f3f4f6;">{block_map["node"]}</span>')
-                            parts.append('<span style="color:#9ca3af;margin:0 2px;">:</span>')
-                            
-                            # Msg Type Description
-                            desc = ""
-                            for s in segs: 
-                                if self._get_attr(s, 'kind')=='msg_type': desc = self._get_attr(s, 'description', ''); break
-                            title_attr = f'title="{html.escape(str(desc))}"' if desc else ''
-                            parts.append(f'<span class="seg-fixed seg-msgtype-sm seg-msgtype" {title_attr} style="background:#fff7ed;color:#9a3412;">{block_map["msg_type"]}</span>')
-                        else:
-                            # Free format fallback
-                            if block_map['pid']: parts.append(f'<span class="seg-fixed seg-pid" style="background:#fef3c7;">{block_map["pid"]}</span>')
-                            for s in segs:
-                                if self._get_attr(s,'kind') not in block_map and self._get_attr(s,'kind') != 'field':
-                                    parts.append(f'<span class="seg-free" style="background:#f3f4f6;">{self._get_attr(s,"text","")}</span>')
-
-                        # Field rendering
-                        if has_dir:
-                            palette = ['#e0f2fe', '#f0fdf4', '#ffedd5', '#f3e8ff', '#ecfeff']
-                            for s in segs:
-                                if self._get_attr(s, 'kind') == 'field':
-                                    idx = int(self._get_attr(s, 'idx', 0))
-                                    bg = palette[idx % len(palette)]
-                                    parts.append(f'<span class="seg-free" style="background:{bg};color:#374151;">{self._get_attr(s, "text", "")}</span>')
-
-                        return "".join(parts) + extra_badges
-
-                    def append_abnormal_badge(entry, badges=""):
-                        if self._get_attr(entry, 'escape_hits'):
-                            badges += ' <span class="tag-abnormal">异常报错</span>'
-                        return badges
+                    trans_attr = _TRANS_ATTR % (index,) if is_transaction else ""
 
                     # 主行
                     badges = ""
                     if is_transaction:
-                        prefix = '<span class="badge-req">发送</span>'
-                        if retry_count > 0: badges += f' <span class="tag" style="background:#fee2e2;color:#991b1b;cursor:pointer;" onclick="toggleRetries(\'{log_id}\')">◀ 重试 x{retry_count}</span>'
-                        if not has_response: badges += ' <span class="tag" style="background:#f3f4f6;color:#6b7280;">[无回复]</span>'
+                        prefix = _REQ_PREFIX
+                        if retry_count > 0: badges += _RETRY_BADGE % (index, retry_count)
+                        if not has_response: badges += _NO_RESP_BADGE
                     else:
                         prefix = ""
                     
-                    badges = append_abnormal_badge(main_entry, badges)
-                    line_html = prefix + render_line_content(main_entry, badges)
+                    if get_attr(main_entry, 'escape_hits'): badges += _ABNORMAL_TAG
                     
-                    ts_val = self._get_attr(main_entry, 'timestamp')
+                    ts_val = get_attr(main_entry, 'timestamp')
                     ts_ms = int(ts_val.timestamp() * 1000) if ts_val and isinstance(ts_val, datetime) else 0
 
-                    f.write(f"""        <div class="timestamp" id="ts_{index}" data-timestamp="{ts_ms}" {trans_attr}>
-                            {line_html}
-                            <a class="jump-btn" href="{raw_filename}#{get_raw_anchor(main_entry)}" target="_blank">原文</a>
-                        </div>\n""")
+                    render_line_content(main_entry, _MAIN_ROW_OPEN % (index, ts_ms), _MAIN_ROW_MID % (trans_attr,),
+                                main_close % (get_raw_anchor(main_entry),), prefix, badges)
 
                     # 重试行
                     if is_transaction and retry_count > 0:
-                        f.write(f'<div id="retries_{log_id}" style="display:none; margin-left: 20px; border-left: 2px solid #e5e7eb; padding-left: 8px;">\n')
-                        for req in getattr(item, 'requests', [])[:-1]:
-                            r_html = render_line_content(req, append_abnormal_badge(req))
-                            f.write(f"""            <div class="timestamp" style="border:none; padding: 2px 0;">
-                                    <span style="color:#9ca3af; margin-right:8px; font-size:12px;">├─ 重试</span>
-                                    {r_html}
-                                    <a class="jump-btn" href="{raw_filename}#{get_raw_anchor(req)}" target="_blank">原文</a>
-                                </div>\n""")
-                        f.write('</div>\n')
+                        append(_RETRIES_OPEN % (index,))
+                        for req in getattr(item, 'requests', _EMPTY)[:-1]:
+                            render_line_content(req, _RETRY_ROW_OPEN, _RETRY_ROW_MID,
+                                        retry_close % (get_raw_anchor(req),), "",
+                                        _ABNORMAL_TAG if get_attr(req, 'escape_hits') else "")
+                        append('</div>\n')
 
                     # 回复行
                     if is_transaction and has_response:
                         resp = getattr(item, 'response')
-                        resp_html = render_line_content(resp, append_abnormal_badge(resp))
-                        f.write(f"""        <div class="timestamp" id="ts_{index}_resp" data-timestamp="{ts_ms}" {trans_attr} style="border-top:none; margin-top:-1px;">
-                            <div class="resp-container">
-                                <span class="tree-connector">└──</span>
-                                <span class="badge-resp">回复</span>
-                                {resp_html}
-                            </div>
-                            <a class="jump-btn" href="{raw_filename}#{get_raw_anchor(resp)}" target="_blank">原文</a>
-                        </div>\n""")
+                        render_line_content(resp, _RESP_ROW_OPEN % (index, ts_ms), _RESP_ROW_MID % (trans_attr,),
+                                    resp_close % (get_raw_anchor(resp),), "",
+                                    _ABNORMAL_TAG if get_attr(resp, 'escape_hits') else "")
 
-                f.write("""    </div> </div> <script>
-                    function toggleRetries(id) {
-                        var el = document.getElementById('retries_' + id);
-                        if (el) el.style.display = el.style.display === 'none' ? 'block' : 'none';
-                    }
-                </script>
-            </body>
-            </html>""")
+                    if len(out) >= _FLUSH_PARTS:
+                        f.write(''.join(out))
+                        out.clear()
 
-            # =================================================================
-            # 2. 生成原文页面 (Raw Page) - 保持不变，仅修复读取逻辑
-            # =================================================================
-            with open(raw_output_path, 'w', encoding='utf-8') as f_raw:
-                f_raw.write(f"""<!DOCTYPE html>
-            <html>
-            <head>
-                <title>日志原文 - {filename}</title>
-                <style>
-                    body {{ font-family: 'Segoe UI', sans-serif; margin: 20px; background: #f0f2f5; color: #374151; }}
-                    .log-entry {{ margin: 10px 0; padding: 12px; background: white; border-radius: 6px; box-shadow: 0 2px 4px rgba(0,0,0,0.05); }}
-                    pre {{ margin: 0; white-space: pre-wrap; font-family: 'JetBrains Mono', monospace; font-size: 13px; }}
-                    .flash-highlight {{ animation: flash 2s ease-out forwards; border: 1px solid #dc2626; }}
-                    @keyframes flash {{ 0% {{ background: #fee2e2; }} 100% {{ background: white; }} }}
-                </style>
-                <script>
-                    window.onload = function() {{
-                        if(location.hash) {{
-                            var el = document.getElementById(location.hash.substring(1));
-                            if(el) {{ el.scrollIntoView({{behavior:'smooth', block:'center'}}); el.classList.add('flash-highlight'); }}
-                        }}
-                    }};
-                </script>
-            </head>
-            <body>""")
-                for index, entry in enumerate(raw_log_entries):
-                    l1 = self._get_attr(entry, 'original_line1', '')
-                    l2 = self._get_attr(entry, 'original_line2', '')
-                    f_raw.write(f'<div class="log-entry" id="log_{index}"><pre>{html.escape(str(l1))}\\n{html.escape(str(l2))}</pre></div>\n')
-                f_raw.write("</body></html>")
+                append(_MAIN_FOOTER)
+                f.write(''.join(out))
+
+            if compress:
+                self._write_gzip_copy(output_path)
+                self._write_gzip_copy(raw_output_path)
 
             self.logger.info(f"HTML报告生成完成: {output_path}")
             return output_path
@@ -662,12 +1005,48 @@ class ReportGenerator:
         except Exception as e:
             self.logger.error(f"生成HTML报告失败: {str(e)}", exc_info=True)
             return None
+        finally:
+            # 清理临时标记
+            self._clear_raw_idx(tagged_entries)
+
+    def _ensure_assets(self, directory: str) -> None:
+        """把报告共用的样式/脚本写到报告目录；文件名带内容哈希，已存在即直接复用"""
+        for name, content in _REPORT_ASSETS:
+            path = os.path.join(directory, name)
+            if os.path.exists(path):
+                continue
+            # 先写临时文件再替换，并发生成报告时浏览器不会读到写了一半的文件；
+            # 用 open 创建（而非 mkstemp 的 0600）使权限遵循 umask，共享目录里其他账户也能读取
+            tmp_path = '%s.%d.%d.tmp' % (path, os.getpid(), threading.get_ident())
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    def _write_gzip_copy(self, path: str) -> None:
+        """按块把已写好的报告压缩为同名 .gz 副本（HTML 重复度高，体积通常只有原文件的一小部分）"""
+        with open(path, 'rb') as src, gzip.open(path + '.gz', 'wb', compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, _WRITE_BUFFERING)
+
+    def _clear_raw_idx(self, entries: List[Any]) -> None:
+        for entry in entries:
+            if isinstance(entry, dict):
+                entry.pop('_raw_idx', None)
+            else:
+                try:
+                    del entry._raw_idx
+                except AttributeError:
+                    pass
 
     def _extract_msg_type(self, entry: Dict[str, Any]) -> str:
         try:
             if self._get_attr(entry, 'message_type'):
                 return str(self._get_attr(entry, 'message_type', '')).strip()
-            for seg in self._get_attr(entry, 'segments', []):
+            for seg in (self._get_attr(entry, 'segments') or _EMPTY):
                 if self._get_attr(seg, 'kind') == 'msg_type':
                     return str(self._get_attr(seg, 'text', '')).strip()
         except Exception:
@@ -679,10 +1058,10 @@ class ReportGenerator:
             ts = self._get_attr(entry, 'timestamp')
             if ts:
                 if isinstance(ts, datetime):
-                    return ts.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+                    return _fmt_ts(ts)
                 else:
                     return str(ts)
-            for seg in self._get_attr(entry, 'segments', []):
+            for seg in (self._get_attr(entry, 'segments') or _EMPTY):
                 if self._get_attr(seg, 'kind') == 'ts':
                     return str(self._get_attr(seg, 'text', '')).strip()
         except Exception:
@@ -714,20 +1093,45 @@ class ReportGenerator:
             'details': details, # 这里现在包含 ["FieldA=Value1", "FieldB=Value2"]
         }
 
+    def _render_abnormal_nav(self, abnormal_items: List[Dict[str, Any]]) -> str:
+        """渲染侧边栏异常列表 HTML（原先由页面脚本在加载时逐项生成）"""
+        if not abnormal_items:
+            return _ABNORMAL_EMPTY
+        parts = []
+        for item in abnormal_items:
+            details = item.get('details')
+            if details:
+                details_html = ''.join(_ABNORMAL_DETAIL % (_escape(str(d)),) for d in details)
+            else:
+                details_html = _ABNORMAL_NO_DETAIL
+            parts.append(_ABNORMAL_ITEM % (
+                _escape(str(item.get('anchor', ''))),
+                _escape(str(item.get('time', ''))),
+                _escape(str(item.get('msgType', ''))),
+                details_html,
+            ))
+        return ''.join(parts)
+
     def _collect_abnormal_items(self, log_entries: List[Any]) -> List[Dict[str, Any]]:
         abnormal_items: List[Dict[str, Any]] = []
+        append = abnormal_items.append
+        build = self._build_abnormal_item
+        get_attr = self._get_attr
         for index, item in enumerate(log_entries):
-            is_transaction = hasattr(item, 'requests') and hasattr(item, 'response')
-            if is_transaction:
+            # 普通条目是 dict，直接取值；其余对象再按事务（requests + response）判断
+            if isinstance(item, dict):
+                if item.get('escape_hits'):
+                    append(build(item, index))
+                continue
+            if hasattr(item, 'requests') and hasattr(item, 'response'):
                 main_entry = getattr(item, 'latest_request', None)
-                if main_entry and self._get_attr(main_entry, 'escape_hits'):
-                    abnormal_items.append(self._build_abnormal_item(main_entry, index))
-                resp_entry = getattr(item, 'response', None)
-                if resp_entry and self._get_attr(resp_entry, 'escape_hits'):
-                    abnormal_items.append(self._build_abnormal_item(resp_entry, index, '_resp'))
-            else:
-                if self._get_attr(item, 'escape_hits'):
-                    abnormal_items.append(self._build_abnormal_item(item, index))
+                if main_entry and get_attr(main_entry, 'escape_hits'):
+                    append(build(main_entry, index))
+                resp_entry = item.response
+                if resp_entry and get_attr(resp_entry, 'escape_hits'):
+                    append(build(resp_entry, index, '_resp'))
+            elif getattr(item, 'escape_hits', None):
+                append(build(item, index))
         return abnormal_items
 
     def _parse_filename_info(self, filename: str) -> Dict[str, str]:
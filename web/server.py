@@ -729,6 +729,7 @@ def clear_parser_config():
         # 删除配置文件
         if os.path.exists(config_path):
             os.remove(config_path)
+            parser_config_manager.invalidate(factory, system)
             logger.info(f"清空解析配置: {factory}/{system}")
             return jsonify({'success': True})
         else:
@@ -19,6 +19,15 @@ export function escapeAttr(unsafe) {
     .replace(/>/g, '&gt;');
 }
 
+// 一次拼好整段 <option> 再赋给 innerHTML，代替逐个 createElement + appendChild
+export function fillSelectOptions(sel, placeholder, items, valueOf = (x) => x, labelOf = valueOf) {
+  const parts = [`<option value="">${escapeHtml(placeholder)}</option>`];
+  for (const it of items || []) {
+    parts.push(`<option value="${escapeAttr(valueOf(it))}">${escapeHtml(labelOf(it))}</option>`);
+  }
+  sel.innerHTML = parts.join('');
+}
+
 export function debounce(fn, wait = 200) {
   let t = null;
   return (...args) => {
@@ -2,7 +2,7 @@
 import { api } from '../core/api.js';
 import { showMessage } from '../core/messages.js';
 import { setButtonLoading } from '../core/ui.js';
-import { formatFileSize, escapeHtml } from '../core/utils.js';
+import { formatFileSize, escapeHtml, fillSelectOptions } from '../core/utils.js';
 
 let inited = false;
 let selectedDownloadedLogs = new Set();
@@ -409,15 +409,9 @@ async function loadParserConfigs(options = {}) {
 
   try {
     const data = await api.getParserConfigs();
-    sel.innerHTML = '<option value="">-- 请选择解析配置 --</option>';
+    fillSelectOptions(sel, '-- 请选择解析配置 --', data.success ? data.configs : [],
+      cfg => cfg.id, cfg => (cfg.name || '').replace('.json', ''));
     if (data.success) {
-      (data.configs || []).forEach(cfg => {
-        const opt = document.createElement('option');
-        opt.value = cfg.id;
-        opt.textContent = (cfg.name || '').replace('.json', '');
-        sel.appendChild(opt);
-      });
-
       if (targetValue && selectHasOption(sel, targetValue)) {
         sel.value = targetValue;
       } else if (targetValue === '') {
@@ -1,7 +1,7 @@
 // web/static/js/modules/download.js
 import { api } from '../core/api.js';
 import { showMessage } from '../core/messages.js';
-import { escapeHtml } from '../core/utils.js';
+import { escapeHtml, fillSelectOptions } from '../core/utils.js';
 import { setButtonLoading } from '../core/ui.js';
 
 let inited = false;
@@ -80,7 +80,9 @@ export function init() {
   bindLeftForm();
   bindRightPanel();
 
-  loadFactories().then(() => syncRightFiltersAndReload());
+  // 初始时厂区/系统均未选，模板列表不依赖厂区下拉，两者同时发起
+  loadFactories();
+  syncRightFiltersAndReload();
   updateRefreshButton();
 
   window.addEventListener('server-configs:changed', (evt) => {
@@ -95,9 +97,10 @@ function bindLeftForm() {
   const systemSel  = qs('#system-select');
 
   factorySel?.addEventListener('change', async () => {
-    await loadSystems(factorySel.value);
+    // 换厂区后系统下拉会重置为空，模板按新厂区过滤，可与系统列表并行加载
     state.filters.factory = factorySel.value || '';
-    syncRightFiltersAndReload();
+    state.filters.system = '';
+    await Promise.all([loadSystems(factorySel.value), reloadTemplates(true)]);
     clearLastSearch();
     if (state.mode === 'selected') unselectTemplateSilent();
   });
@@ -766,13 +769,7 @@ async function loadFactories() {
   if (!sel) return;
   try {
     const list = await api.getFactories();
-    sel.innerHTML = '<option value="">-- 请选择厂区 --</option>';
-    (list || []).forEach(f => {
-      const opt = document.createElement('option');
-      opt.value = f.id;
-      opt.textContent = f.name;
-      sel.appendChild(opt);
-    });
+    fillSelectOptions(sel, '-- 请选择厂区 --', list, f => f.id, f => f.name);
   } catch (err) {
     $msg('error', '加载厂区失败：' + (err?.message || err));
   }
@@ -787,13 +784,7 @@ async function loadSystems(factoryId) {
   }
   try {
     const list = await api.getSystems(factoryId);
-    sel.innerHTML = '<option value="">-- 请选择系统 --</option>';
-    (list || []).forEach(s => {
-      const opt = document.createElement('option');
-      opt.value = s.id;
-      opt.textContent = s.name;
-      sel.appendChild(opt);
-    });
+    fillSelectOptions(sel, '-- 请选择系统 --', list, s => s.id, s => s.name);
   } catch (err) {
     $msg('error', '加载系统失败：' + (err?.message || err));
   }
@@ -1,6 +1,6 @@
 // modules/parser-config.js
 // 注意：本模块只做“解析逻辑配置”一栏的行为，其他三大模块互不影响
-import { escapeHtml, escapeAttr } from '../core/utils.js';
+import { escapeHtml, escapeAttr, fillSelectOptions } from '../core/utils.js';
 import { showMessage } from '../core/messages.js';
 import { setButtonLoading } from '../core/ui.js';
 import { api } from '../core/api.js';
@@ -380,12 +380,7 @@ async function loadParserFactoriesSafe() {
   if (!sel) return;
   try {
     const list = await api.getFactories();
-    sel.innerHTML = '<option value="">-- 请选择厂区 --</option>';
-    (list || []).forEach(f => {
-      const opt = document.createElement('option');
-      opt.value = f.id; opt.textContent = f.name;
-      sel.appendChild(opt);
-    });
+    fillSelectOptions(sel, '-- 请选择厂区 --', list, f => f.id, f => f.name);
   } catch (_) { }
 }
 
@@ -399,12 +394,7 @@ async function loadParserSystems() {
   }
   try {
     const list = await api.getSystems(factoryId);
-    sel.innerHTML = '<option value="">-- 请选择系统 --</option>';
-    (list || []).forEach(s => {
-      const opt = document.createElement('option');
-      opt.value = s.id; opt.textContent = s.name;
-      sel.appendChild(opt);
-    });
+    fillSelectOptions(sel, '-- 请选择系统 --', list, s => s.id, s => s.name);
   } catch (e) {
     showMessage('error', '加载系统失败：' + (e?.message || e), 'parser-config-messages');
   }
@@ -1255,13 +1245,7 @@ function rebuildEscapeModalOptions(pref = {}) {
   const mtSel = qs('#escape-message-type');
   if (!mtSel) return;
   const mts = Object.keys(workingConfig || {});
-  mtSel.innerHTML = '<option value="">-- 请选择报文类型 --</option>';
-  mts.forEach((name) => {
-    const opt = document.createElement('option');
-    opt.value = name;
-    opt.textContent = name;
-    mtSel.appendChild(opt);
-  });
+  fillSelectOptions(mtSel, '-- 请选择报文类型 --', mts);
   const targetMt = mts.includes(pref.messageType) ? pref.messageType : (mts[0] || '');
   setSelectValue(mtSel, targetMt);
   rebuildEscapeVersionOptions(targetMt, pref.version, pref.field);
@@ -1271,13 +1255,7 @@ function rebuildEscapeVersionOptions(mt, preferredVersion = '', preferredField =
   const vSel = qs('#escape-version');
   if (!vSel) return;
   const versions = Object.keys(workingConfig?.[mt]?.Versions || {});
-  vSel.innerHTML = '<option value="">-- 请选择版本 --</option>';
-  versions.forEach((name) => {
-    const opt = document.createElement('option');
-    opt.value = name;
-    opt.textContent = name;
-    vSel.appendChild(opt);
-  });
+  fillSelectOptions(vSel, '-- 请选择版本 --', versions);
   const targetVer = versions.includes(preferredVersion) ? preferredVersion : (versions[0] || '');
   setSelectValue(vSel, targetVer);
   rebuildEscapeFieldOptions(mt, targetVer, preferredField);
@@ -1288,13 +1266,7 @@ function rebuildEscapeFieldOptions(mt, ver, preferredField = '') {
   const submitBtn = qs('#escape-submit-btn');
   if (!fSel) return;
   const fields = Object.keys(workingConfig?.[mt]?.Versions?.[ver]?.Fields || {});
-  fSel.innerHTML = '<option value="">-- 请选择字段 --</option>';
-  fields.forEach((name) => {
-    const opt = document.createElement('option');
-    opt.value = name;
-    opt.textContent = name;
-    fSel.appendChild(opt);
-  });
+  fillSelectOptions(fSel, '-- 请选择字段 --', fields);
   let targetField = preferredField;
   if (!fields.includes(targetField)) {
     targetField = fields[0] || '';